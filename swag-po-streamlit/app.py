@@ -1,11 +1,48 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
 from datetime import datetime
-import xmlrpc.client
-import io
-import pdfplumber
+import os
+import json
+import hashlib
+import uuid
 from PIL import Image
 
+from fuzzy_match import TrigramIndex, suggestion_label
+from engine import connect, parse_file_bytes
+from jobs import FINISHED, JobRunner
+from odoo_client import run_concurrently
+from po_create import (
+    LARGE_PO_THRESHOLD,
+    build_po_vals,
+    group_purchase_orders,
+    header_keys,
+    resume_checkpoint,
+)
+from po_dedup import DUPLICATE_LOOKBACK_DAYS, MERGE_RULES, aggregate_lines, find_duplicate_pos
+from po_lines import build_order_lines
+from preview import PREVIEW_PAGE_ROWS, preview_positions, preview_window
+from product_catalog import ProductCatalog, catalog_path
+from product_resolver import resolve_products, split_matched
+from rfq import (
+    CONFIRM_BATCH_SIZE,
+    RFQ_PAGE_SIZE,
+    RFQ_STATES,
+    RfqPageStore,
+    RfqSnapshot,
+    rfq_domain,
+    with_display_columns,
+)
+from session_store import (
+    LOG_CAPACITY,
+    LineStore,
+    RowSelection,
+    compact_lines_df,
+    record_session_memory,
+    session_memory_report,
+)
+from tracing import TRACE_DEFAULT, SessionTrace, activate, span
+
 # ========= PAGE CONFIG =========
 st.set_page_config(
     page_title="SWAG Purchase Order Creator",
@@ -23,20 +60,44 @@ for key, default in {
     "company_id": None,
     "df": None,
     "source_type": None,  # "excel" or "pdf"
-    "po_lines": None,
+    "po_lines": None,        # LineStore of matched PO lines
+    "po_checkpoint": None,   # progress of a chunked large-PO create
+    "po_checkpoints": None,  # group key -> checkpoint of a large PO in split mode
     "po_missing_products": None,
     "current_missing_index": 0,
     "vendor_id": None,
     "picking_type_id": None,
     "distribution_id": None,
     "pdf_total": None,
-    "selected_rows": None,   # uploaded file selected lines
+    "selected_rows": None,   # RowSelection of uploaded file lines
     "rfq_df": None,          # existing RFQ dataframe
     "selected_rfq_ids": [],  # selected RFQ IDs
+    "rfq_store": None,       # paginated RFQ page cache
+    "rfq_snapshots": {},     # company_id -> incremental RfqSnapshot
+    "catalog_matched": None, # uploaded lines found in local product catalog
+    "trace": None,           # SessionTrace of Odoo calls / stage timings
+    "po_job_key": None,      # idempotency key of the current set of PO lines
+    "job_ids": [],           # background jobs submitted from this session
+    "jobs_settled": [],      # finished jobs whose side effects were applied
 }.items():
     if key not in st.session_state:
         st.session_state[key] = default
 
+_run_ctx = get_script_run_ctx()
+if _run_ctx is not None:
+    record_session_memory(_run_ctx.session_id, st.session_state)
+
+# ========= TRACING =========
+# Off by default (SWAG_TRACE=1 or the admin toggle turns it on). Every rerun
+# binds its own trace, or None, so a previous rerun's trace never leaks in.
+if st.session_state.trace is None:
+    st.session_state.trace = SessionTrace(_run_ctx.session_id if _run_ctx else None)
+rerun_trace = (
+    st.session_state.trace.begin_rerun()
+    if st.session_state.get("tracing_on", TRACE_DEFAULT) else None
+)
+activate(rerun_trace)
+
 # ========= TRANSLATIONS =========
 T = {
     "title": {
@@ -92,8 +153,8 @@ T = {
         "ar": "أسقط الملف هنا أو اضغط للاختيار",
     },
     "uploader_help": {
-        "en": "Supported: Excel (.xlsx, .xls) and PDF invoice.",
-        "ar": "يدعم: إكسل (.xlsx, .xls) و فاتورة PDF.",
+        "en": "Supported: Excel (.xlsx, .xls), CSV, Parquet and PDF invoice.",
+        "ar": "يدعم: إكسل (.xlsx, .xls) و CSV و Parquet و فاتورة PDF.",
     },
     "step2_company": {"en": "2️⃣ Connect & Choose Company", "ar": "2️⃣ الاتصال واختيار الشركة"},
     "btn_test_conn": {"en": "🔄 Test Odoo Connection", "ar": "🔄 تجربة الاتصال بأودو"},
@@ -158,6 +219,15 @@ T = {
     "lang_ar": {"en": "Arabic", "ar": "العربية"},
     "source_excel": {"en": "Excel", "ar": "إكسل"},
     "source_pdf": {"en": "PDF Invoice", "ar": "فاتورة PDF"},
+    "source_csv": {"en": "CSV", "ar": "CSV"},
+    "source_parquet": {"en": "Parquet", "ar": "Parquet"},
+}
+
+UPLOAD_TYPES = {
+    "excel": ["xlsx", "xls"],
+    "pdf": ["pdf"],
+    "csv": ["csv"],
+    "parquet": ["parquet"],
 }
 
 def tr(key):
@@ -259,14 +329,13 @@ except Exception:
     pass
 
 # ========= XML‑RPC HELPERS =========
+RFQ_SNAPSHOT_TTL = int(os.environ.get("SWAG_RFQ_SNAPSHOT_TTL", "60"))
+ODOO_POOL_SIZE = int(os.environ.get("SWAG_ODOO_POOL_SIZE", "4"))
+ODOO_TIMEOUT = float(os.environ.get("SWAG_ODOO_TIMEOUT", "60"))
+
 @st.cache_resource(show_spinner=False)
 def get_odoo_connection(url, db, username, api_key):
-    common = xmlrpc.client.ServerProxy(f"{url}/xmlrpc/2/common")
-    uid = common.authenticate(db, username, api_key, {})
-    if not uid:
-        raise Exception("Authentication failed! URL / DB / username / API key check karo.")
-    models = xmlrpc.client.ServerProxy(f"{url}/xmlrpc/2/object")
-    return db, uid, api_key, models
+    return connect(url, db, username, api_key, pool_size=ODOO_POOL_SIZE, timeout=ODOO_TIMEOUT)
 
 def load_companies(models, db, uid, password):
     return models.execute_kw(
@@ -303,89 +372,179 @@ def load_distributions(models, db, uid, password):
     )
     return dists
 
-# ---------- RFQ helpers ----------
-def load_rfq(models, db, uid, password, company_id=None, limit=100):
-    domain = [["state", "in", ["draft", "sent"]]]
-    if company_id:
-        domain.append(["company_id", "=", company_id])
-    rfqs = models.execute_kw(
-        db, uid, password,
-        "purchase.order", "search_read",
-        [domain],
-        {"fields": ["name", "partner_id", "date_order", "amount_total", "state", "company_id"], "limit": limit},
-    )
-    return rfqs
-
-def confirm_rfq(models, db, uid, password, rfq_ids, ctx=None):
-    if not rfq_ids:
-        return
-    ctx = ctx or {}
-    models.execute_kw(
-        db, uid, password,
-        "purchase.order", "button_confirm",
-        [rfq_ids],
-        {"context": ctx},
-    )
-
-# ========= PDF PARSER =========
-def parse_swag_pdf_to_df(file_bytes: bytes) -> pd.DataFrame:
-    import re
-    rows = []
-
-    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-        full_text = ""
-        for page in pdf.pages:
-            t = page.extract_text() or ""
-            full_text += t + "\n"
+@st.cache_resource(show_spinner=False)
+def get_product_catalog(url, db):
+    return ProductCatalog(catalog_path(url, db))
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_fuzzy_index(url, db, last_sync):
+    # last_sync is part of the key so a catalog sync rebuilds the index.
+    return TrigramIndex(get_product_catalog(url, db).iter_products())
+
+# ---------- Master data cache ----------
+# Vendors / picking types / distributions rarely change, so they are cached per
+# URL + DB + company across reruns and sessions. A warm rerun makes no Odoo call.
+MASTER_DATA_TTL = int(os.environ.get("SWAG_MASTER_DATA_TTL", "600"))
+MASTER_DATA_MAX_ENTRIES = int(os.environ.get("SWAG_MASTER_DATA_MAX_ENTRIES", "32"))
+
+@st.cache_data(ttl=MASTER_DATA_TTL, max_entries=MASTER_DATA_MAX_ENTRIES, show_spinner=False)
+def load_master_data(url, db, username, api_key, company_id=None):
+    db, uid, password, models = get_odoo_connection(url, db, username, api_key)
+    with span("stage", "master_data"):
+        master, timings = run_concurrently(
+            {
+                "vendors": (load_vendors, models, db, uid, password),
+                "pickings": (load_picking_types, models, db, uid, password),
+                "distributions": (load_distributions, models, db, uid, password),
+                "companies": (load_companies, models, db, uid, password),
+            }
+        )
+    master["timings"] = timings
+    master["loaded_at"] = datetime.now().strftime("%H:%M:%S")
+    return master
 
-    for line in full_text.splitlines():
-        if "SR" not in line:
-            continue
-        try:
-            price_match = re.findall(r"SR\s*([\d,]+\.?\d*)", line)
-            if len(price_match) < 1:
-                continue
-            price_str = price_match[-1].replace(",", "")
-            price = float(price_str)
-
-            qty_match = re.search(rf"{price_str}[^\d]+(\d+)", line)
-            if not qty_match:
-                continue
-            qty = float(qty_match.group(1))
-
-            tokens = re.findall(r"[A-Za-z0-9\-]+", line)
-            model_candidates = [t for t in tokens if re.search(r"[A-Za-z]", t)]
-            model = model_candidates[-1] if model_candidates else line.strip()
-
-            rows.append(
-                {
-                    "order_line/name": model,
-                    "order_line/product_uom_qty": qty,
-                    "order_line/price_unit": price,
-                }
-            )
-        except Exception:
-            continue
+# ========= BACKGROUND JOBS =========
+JOB_POLL_SECONDS = float(os.environ.get("SWAG_JOB_POLL_SECONDS", "1.5"))
+JOBS_SHOWN = 5
 
-    all_amounts = re.findall(r"SR\s*([\d,]+\.?\d*)", full_text)
-    if all_amounts:
-        total_str = all_amounts[-1].replace(",", "")
-        try:
-            st.session_state.pdf_total = float(total_str)
-        except Exception:
-            st.session_state.pdf_total = None
+@st.cache_resource(show_spinner=False)
+def get_job_runner():
+    return JobRunner()
+
+def track_job(job_id, started):
+    if job_id not in st.session_state.job_ids:
+        st.session_state.job_ids.append(job_id)
+    # A retry reuses the job ID; settle it again when it finishes.
+    if started and job_id in st.session_state.jobs_settled:
+        st.session_state.jobs_settled.remove(job_id)
+
+def explain_existing_job(job_id, subject):
+    # submit() handed back an existing job instead of starting one.
+    job = get_job_runner().get(job_id)
+    status = job["status"] if job else "unknown"
+    if status in ("queued", "running"):
+        st.warning(f"{subject} are already being processed by job {job_id[:8]}.")
+    elif status == "done":
+        st.info(f"{subject} were already processed by job {job_id[:8]}; see its result below.")
     else:
-        st.session_state.pdf_total = None
-
-    if not rows:
-        return pd.DataFrame(
-            columns=[
-                "order_line/name",
-                "order_line/product_uom_qty",
-                "order_line/price_unit",
-            ]
+        st.warning(
+            f"{subject} were submitted as job {job_id[:8]}, which ended '{status}' with "
+            "other settings. Restore the settings it ran with to retry it."
         )
-    return pd.DataFrame(rows)
+
+def settle_job(job):
+    # Runs once per finished job: drop cached RFQ pages so the table reflects
+    # what the job changed in Odoo.
+    st.session_state.jobs_settled.append(job["id"])
+    if job["kind"] == "rfq_confirm":
+        if st.session_state.get("rfq_store") is not None:
+            st.session_state.rfq_store.invalidate()
+        snapshot = st.session_state.rfq_snapshots.get(st.session_state.company_id)
+        if snapshot is not None:
+            snapshot.refreshed_at = None
+
+def render_job(job):
+    icon = {"queued": "⏳", "running": "🔄", "done": "✅", "partial": "⚠️"}.get(job["status"], "❌")
+    label = "PO create" if job["kind"] == "po_create" else "RFQ confirm"
+    st.markdown(f"{icon} **{label}** · job `{job['id'][:8]}` · {job['status']}")
+    progress = job["progress"]
+    if job["status"] == "running" and progress and progress.get("total"):
+        st.progress(
+            progress["done"] / progress["total"],
+            text=f"{progress['done']}/{progress['total']}"
+            + (f" · {progress['lines_per_sec']} lines/s" if progress.get("lines_per_sec") else ""),
+        )
+    result = job["result"]
+    if result:
+        rows = result.get("pos") or result.get("results") or []
+        st.caption(f"{len(rows)} records in {result['seconds']}s, {result['failed']} failed")
+        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+    if job["error"]:
+        st.error(f"Job error: {job['error']}")
+        if job["kind"] == "po_create" and job["status"] == "error":
+            st.caption("Click create again to retry (a large PO resumes where it stopped).")
+
+def render_jobs_panel():
+    jobs = get_job_runner().find(st.session_state.job_ids[-JOBS_SHOWN:])
+    if not jobs:
+        return
+    active = any(job["status"] not in FINISHED for job in jobs)
+
+    @st.fragment(run_every=JOB_POLL_SECONDS if active else None)
+    def jobs_fragment():
+        st.markdown("#### ⏳ Background jobs")
+        settled_now = False
+        for job in get_job_runner().find(st.session_state.job_ids[-JOBS_SHOWN:]):
+            render_job(job)
+            if job["status"] in FINISHED and job["id"] not in st.session_state.jobs_settled:
+                settle_job(job)
+                settled_now = True
+        if settled_now and active:
+            st.rerun()
+
+    jobs_fragment()
+
+# ========= PARSE CACHE =========
+# Parsed uploads are cached by content hash + parser version, so clicking rows
+# on an already parsed file does not re-run openpyxl / pdfplumber. Memory cache
+# is LRU-bounded; SWAG_PARSE_CACHE_DIR optionally spills results to Parquet.
+PARSER_VERSION = "3"
+PARSE_CACHE_MAX_ENTRIES = int(os.environ.get("SWAG_PARSE_CACHE_MAX_ENTRIES", "16"))
+PARSE_CACHE_DIR = os.environ.get("SWAG_PARSE_CACHE_DIR", "")
+
+def file_digest(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+def _spill_path(digest, source, parser_version):
+    return os.path.join(PARSE_CACHE_DIR, f"{digest}-{source}-v{parser_version}")
+
+def _read_spill(digest, source, parser_version):
+    if not PARSE_CACHE_DIR:
+        return None
+    base = _spill_path(digest, source, parser_version)
+    try:
+        df = pd.read_parquet(base + ".parquet")
+        with open(base + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+    except Exception:
+        return None
+    return df, meta.get("pdf_total")
+
+def _write_spill(digest, source, parser_version, df, pdf_total):
+    if not PARSE_CACHE_DIR:
+        return
+    base = _spill_path(digest, source, parser_version)
+    try:
+        os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
+        df.to_parquet(base + ".parquet", index=False)
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump({"pdf_total": pdf_total}, f)
+    except Exception:
+        # Spill is best effort (e.g. pyarrow missing, read-only disk).
+        pass
+
+@st.cache_data(max_entries=PARSE_CACHE_MAX_ENTRIES, show_spinner=False)
+def parse_uploaded_file(digest, source, parser_version, _file_bytes):
+    cached = _read_spill(digest, source, parser_version)
+    if cached is not None:
+        return cached + ({"rows": len(cached[0]), "source": "disk cache"},)
+
+    df, pdf_total, stats = parse_file_bytes(_file_bytes, source)
+    df = compact_lines_df(df)
+    _write_spill(digest, source, parser_version, df, pdf_total)
+    return df, pdf_total, stats
+
+@st.cache_data(max_entries=PARSE_CACHE_MAX_ENTRIES, show_spinner=False)
+def catalog_matched_count(url, db, last_sync, digest, source, parser_version, _df):
+    # Keyed by file and catalog sync, so a warm rerun (a row click) runs no
+    # catalog query for the hero metric.
+    names = _df["order_line/name"]
+    unique_names = names.unique().tolist()
+    catalog_index = get_product_catalog(url, db).match(unique_names)
+    matched_names = [n for n in unique_names if catalog_index.lookup(n) is not None]
+    # isin, not map: mapping a categorical column can stay categorical,
+    # which cannot be summed.
+    return int(names.isin(matched_names).sum())
 
 # ========= HEADER =========
 st.markdown(f'<p class="main-title">{tr("title")}</p>', unsafe_allow_html=True)
@@ -406,10 +565,13 @@ with hero_left:
         """,
         unsafe_allow_html=True,
     )
-with hero_right:
+def render_session_metrics(target):
     rows = len(st.session_state.df) if st.session_state.get("df") is not None else 0
-    matched = len(st.session_state.po_lines) if st.session_state.get("po_lines") else 0
-    st.markdown(
+    if st.session_state.get("po_lines"):
+        matched = len(st.session_state.po_lines)
+    else:
+        matched = st.session_state.get("catalog_matched") or 0
+    target.markdown(
         f"""
         <div class="glass-card" style="padding:0.9rem 1.1rem; margin-bottom:0.8rem;">
             <div style="font-size:0.8rem; color:#9ca3af; margin-bottom:0.4rem;">
@@ -434,6 +596,10 @@ with hero_right:
         unsafe_allow_html=True,
     )
 
+with hero_right:
+    session_metrics = st.empty()
+    render_session_metrics(session_metrics)
+
 # ========= SIDEBAR =========
 with st.sidebar:
     st.markdown("### 🌐 " + tr("lang_label"))
@@ -455,16 +621,52 @@ with st.sidebar:
 
     vendors, pickings, distributions = [], [], []
     if ODOO_URL and ODOO_DB and ODOO_USERNAME and ODOO_API_KEY:
+        if st.button("🔄 Refresh master data", key="refresh_master_data"):
+            load_master_data.clear()
         try:
-            db, uid, password, models = get_odoo_connection(
-                ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_API_KEY
+            master = load_master_data(
+                ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_API_KEY,
+                st.session_state.company_id,
             )
-            vendors = load_vendors(models, db, uid, password)
-            pickings = load_picking_types(models, db, uid, password)
-            distributions = load_distributions(models, db, uid, password)
+            vendors = master["vendors"]
+            pickings = master["pickings"]
+            distributions = master["distributions"]
+            st.caption(f"Master data loaded at {master['loaded_at']}")
+            with st.expander("⏱ Master data load timings", expanded=False):
+                st.write(
+                    {name: f"{seconds * 1000:.0f} ms" for name, seconds in master["timings"].items()}
+                )
         except Exception as e:
             st.error(f"Odoo master data error: {e}")
 
+    st.markdown("### 📦 Product Catalog")
+    product_catalog = None
+    if ODOO_URL and ODOO_DB:
+        product_catalog = get_product_catalog(ODOO_URL, ODOO_DB)
+        if st.button("🔄 Sync product catalog", key="sync_catalog"):
+            if not (ODOO_USERNAME and ODOO_API_KEY):
+                st.error("Fill Odoo connection in sidebar.")
+            else:
+                try:
+                    db, uid, password, models = get_odoo_connection(
+                        ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_API_KEY
+                    )
+                    result = product_catalog.sync(models, db, uid, password)
+                    st.success(
+                        f"Pulled {result['pulled']} products in {result['seconds']:.2f}s"
+                    )
+                except Exception as e:
+                    st.error(f"Product catalog sync error: {e}")
+        catalog_meta = product_catalog.meta()
+        if catalog_meta.get("last_run"):
+            st.caption(
+                f"{len(product_catalog)} products · last sync {catalog_meta['last_run']} "
+                f"({catalog_meta['last_pulled']} rows in {catalog_meta['last_duration']}s)"
+            )
+        else:
+            product_catalog = None
+            st.caption("Not synced yet – products are looked up in Odoo directly.")
+
     if vendors:
         vendor_names = [v["name"] for v in vendors]
         vendor_choice = st.selectbox("Vendor", vendor_names, key="vendor_select")
@@ -508,6 +710,14 @@ with st.sidebar:
         st.caption(tr("excel_tip"))
     with st.expander(tr("pdf_help_title"), expanded=False):
         st.write(tr("pdf_help_text"))
+    with st.expander("🛠 Admin · session memory", expanded=False):
+        st.dataframe(pd.DataFrame(session_memory_report()), use_container_width=True)
+        st.checkbox(
+            "Trace Odoo calls and stage timings",
+            value=TRACE_DEFAULT,
+            key="tracing_on",
+            help="Shows a timing panel in the log tab; takes effect on the next rerun.",
+        )
 
 connection_status = st.empty()
 
@@ -524,27 +734,19 @@ with tab_upload:
 
         source = st.radio(
             "Source type",
-            options=["excel", "pdf"],
-            format_func=lambda x: tr("source_excel") if x == "excel" else tr("source_pdf"),
+            options=list(UPLOAD_TYPES),
+            format_func=lambda x: tr(f"source_{x}"),
             horizontal=True,
         )
         st.session_state.source_type = source
 
         st.markdown('<div class="upload-box">', unsafe_allow_html=True)
-        if source == "excel":
-            uploaded_file = st.file_uploader(
-                tr("uploader_label"),
-                type=["xlsx", "xls"],
-                help=tr("uploader_help"),
-                key="excel_uploader",
-            )
-        else:
-            uploaded_file = st.file_uploader(
-                tr("uploader_label"),
-                type=["pdf"],
-                help=tr("uploader_help"),
-                key="pdf_uploader",
-            )
+        uploaded_file = st.file_uploader(
+            tr("uploader_label"),
+            type=UPLOAD_TYPES[source],
+            help=tr("uploader_help"),
+            key=f"{source}_uploader",
+        )
         st.markdown("</div>", unsafe_allow_html=True)
 
     with c2:
@@ -567,10 +769,10 @@ with tab_upload:
                 st.error("Fill Odoo connection in sidebar.")
             else:
                 try:
-                    db, uid, password, models = get_odoo_connection(
-                        ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_API_KEY
-                    )
-                    companies = load_companies(models, db, uid, password)
+                    companies = load_master_data(
+                        ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_API_KEY,
+                        st.session_state.company_id,
+                    )["companies"]
                 except Exception as e:
                     st.error(f"Company load error: {e}")
                     companies = []
@@ -607,52 +809,89 @@ with tab_upload:
     # ========= FILE PARSE + SELECTION UI =========
     if 'uploaded_file' in locals() and uploaded_file is not None:
         try:
-            file_bytes = uploaded_file.read()
-            if source == "excel":
-                df = pd.read_excel(io.BytesIO(file_bytes), engine="openpyxl")
-                st.session_state.pdf_total = None
-            else:
-                df = parse_swag_pdf_to_df(file_bytes)
-
-            name_col = "order_line/name"
-            qty_col = "order_line/product_uom_qty"
-            price_col = "order_line/price_unit"
-
-            if name_col in df.columns:
-                df[name_col] = df[name_col].astype(str)
-            for col in [qty_col, price_col]:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors="coerce")
+            file_bytes = uploaded_file.getvalue()
+            digest = file_digest(file_bytes)
+            with span("stage", f"parse.{source}", bytes=len(file_bytes)) as parse_span:
+                df, st.session_state.pdf_total, parse_stats = parse_uploaded_file(
+                    digest, source, PARSER_VERSION, file_bytes
+                )
+                parse_span["rows"] = len(df)
+            if parse_stats.get("rows_per_sec"):
+                st.caption(
+                    f"Parsed {parse_stats['rows']} rows in {parse_stats['seconds']}s "
+                    f"({parse_stats['rows_per_sec']:,} rows/s)"
+                )
 
             st.session_state.df = df
+            if product_catalog is not None and "order_line/name" in df.columns:
+                st.session_state.catalog_matched = catalog_matched_count(
+                    ODOO_URL, ODOO_DB, catalog_meta.get("last_sync"),
+                    digest, source, PARSER_VERSION, df,
+                )
+                render_session_metrics(session_metrics)
 
             st.markdown("#### " + tr("step3_preview"))
 
-            event = st.dataframe(
-                df,
-                use_container_width=True,
-                on_select="rerun",
-                selection_mode="multi-row",
-            )
-
             total_rows = len(df)
             if st.session_state.selected_rows is None:
-                st.session_state.selected_rows = list(range(total_rows))
+                st.session_state.selected_rows = RowSelection.all(total_rows)
+
+            v1, v2, v3 = st.columns([2, 1.2, 0.8])
+            with v1:
+                preview_search = st.text_input("Search model / name", key="preview_search")
+            with v2:
+                preview_sort = st.selectbox(
+                    "Sort by", ["(file order)"] + list(df.columns), key="preview_sort"
+                )
+            with v3:
+                preview_desc = st.checkbox("Descending", key="preview_desc")
+            positions = preview_positions(
+                df,
+                preview_search,
+                None if preview_sort == "(file order)" else preview_sort,
+                not preview_desc,
+            )
+            preview_pages = max(1, -(-len(positions) // PREVIEW_PAGE_ROWS))
+            preview_page = 1
+            if preview_pages > 1:
+                preview_page = st.number_input(
+                    f"Preview page (of {preview_pages})",
+                    min_value=1, max_value=preview_pages, value=1, step=1, key="preview_page",
+                )
+            window_df, window = preview_window(df, positions, preview_page - 1)
 
-            st.markdown("")
             select_all_checkbox = st.checkbox(
                 "Select all uploaded lines",
                 value=len(st.session_state.selected_rows) == total_rows and total_rows > 0,
                 help="Tick to select all lines, untick to use manual selection.",
             )
-
-            selected_from_df = event.selection.rows if event is not None else []
-
             if select_all_checkbox:
-                st.session_state.selected_rows = list(range(total_rows))
-            else:
-                if selected_from_df:
-                    st.session_state.selected_rows = selected_from_df
+                st.session_state.selected_rows = RowSelection.all(total_rows)
+            elif st.session_state.selected_rows.is_all:
+                # Manual mode starts from an empty selection.
+                st.session_state.selected_rows = RowSelection(total_rows, [])
+
+            # The Select column is drawn from selected_rows on every rerun, so
+            # a window shows its earlier picks when the user comes back to it
+            # (a dataframe's own row selection is dropped once it is hidden).
+            window_selected = st.session_state.selected_rows.contains(window)
+            edited = st.data_editor(
+                window_df.assign(Select=window_selected)[["Select", *window_df.columns]],
+                use_container_width=True,
+                disabled=list(window_df.columns),
+                key=(
+                    f"preview_{select_all_checkbox}_{preview_search}_{preview_sort}_"
+                    f"{preview_desc}_{preview_page}"
+                ),
+            )
+            st.caption(f"Showing {len(window)} of {len(positions)} matching rows ({total_rows} total)")
+
+            ticked = edited["Select"].to_numpy(dtype=bool)
+            if (ticked != window_selected).any():
+                # Rows outside this window keep their state.
+                st.session_state.selected_rows = st.session_state.selected_rows.replace_window(
+                    window, window[ticked]
+                )
 
             st.caption(
                 f"Selected uploaded lines for PO: {len(st.session_state.selected_rows)} / {total_rows}"
@@ -665,6 +904,7 @@ with tab_upload:
     else:
         st.session_state.df = None
         st.session_state.selected_rows = None
+        st.session_state.catalog_matched = None
 
     st.markdown("")
     create_disabled = not (
@@ -727,6 +967,32 @@ with tab_log:
 
     if lines:
         st.markdown("---")
+        merge_rule = st.selectbox(
+            "Duplicate lines", list(MERGE_RULES), format_func=MERGE_RULES.get, key="merge_rule"
+        )
+        lines, merged_count = aggregate_lines(lines, merge_rule)
+        if merged_count:
+            st.caption(f"{merged_count} duplicate lines merged → {len(lines)} order lines")
+        po_groups = group_purchase_orders(lines, lines.keys())
+        split_po = False
+        if len(po_groups) > 1:
+            split_po = st.checkbox(
+                f"Split into {len(po_groups)} POs (by vendor / operation type / analytic distribution)",
+                value=True,
+                key="split_po",
+            )
+        checkpoint = st.session_state.get("po_checkpoint")
+        if checkpoint and checkpoint["po_id"] and checkpoint["lines_done"] < checkpoint["lines_total"]:
+            st.caption(
+                f"Resumable PO ID {checkpoint['po_id']}: "
+                f"{checkpoint['lines_done']}/{checkpoint['lines_total']} lines written."
+            )
+        check_duplicates = st.checkbox(
+            f"Stop if the same lines were ordered from the vendor in the last "
+            f"{DUPLICATE_LOOKBACK_DAYS} days",
+            value=True,
+            key="check_duplicate_po",
+        )
         if st.button("🚀 Create Draft Purchase Order in Odoo (using selected lines)"):
             try:
                 ODOO_URL = company_snapshot["ODOO_URL"]
@@ -740,29 +1006,65 @@ with tab_log:
                 db, uid, password, models = get_odoo_connection(
                     ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_API_KEY
                 )
+                duplicates = {}
+                if check_duplicates:
+                    check_groups = (
+                        po_groups if split_po
+                        else {(vendor_id, picking_type_id, None): list(lines)}
+                    )
+                    duplicates = find_duplicate_pos(models, db, uid, password, check_groups, ctx)
             except Exception as e:
                 st.error(f"Odoo connection error (PO create): {e}")
             else:
-                order_lines = [(0, 0, line) for line in lines]
-                po_vals = {
-                    "partner_id": int(vendor_id),
-                    "date_order": datetime.now().strftime("%Y-%m-%d"),
-                    "company_id": company_id,
-                    "picking_type_id": picking_type_id,
-                    "order_line": order_lines,
-                }
-                try:
-                    po_id = models.execute_kw(
-                        db, uid, password,
-                        "purchase.order", "create",
-                        [po_vals],
-                        {"context": ctx},
+                if duplicates:
+                    st.error(
+                        "Identical lines were already ordered from this vendor: "
+                        + ", ".join(sorted({n for names in duplicates.values() for n in names}))
+                        + ". Untick the duplicate check to create anyway."
                     )
-                    st.success(
-                        f"✅ {tr('success_po')} ({company_snapshot['company_name']}) : ID {po_id}"
+                else:
+                    runtime = {
+                        "conn": (db, uid, password, models),
+                        "ctx": ctx,
+                        "company_id": company_id,
+                        "vendor_id": vendor_id,
+                        "picking_type_id": picking_type_id,
+                        "lines": lines,
+                    }
+                    if split_po:
+                        if st.session_state.po_checkpoints is None:
+                            st.session_state.po_checkpoints = {}
+                        runtime.update(
+                            mode="split", groups=po_groups,
+                            checkpoints=st.session_state.po_checkpoints,
+                        )
+                    elif len(lines) > LARGE_PO_THRESHOLD:
+                        po_vals = build_po_vals(vendor_id, picking_type_id, company_id, [])
+                        checkpoint = resume_checkpoint(
+                            st.session_state.get("po_checkpoint"), po_vals, lines
+                        )
+                        st.session_state.po_checkpoint = checkpoint
+                        runtime.update(mode="large", checkpoint=checkpoint)
+                    else:
+                        runtime.update(mode="single")
+                    job_id, started = get_job_runner().submit(
+                        "po_create",
+                        st.session_state.po_job_key,
+                        {
+                            "mode": runtime["mode"],
+                            "company": company_snapshot["company_name"],
+                            "vendor_id": vendor_id,
+                            "lines": len(lines),
+                            "merge_rule": merge_rule,
+                            "groups": list(po_groups) if split_po else None,
+                        },
+                        runtime,
                     )
-                except Exception as e:
-                    st.error(f"Odoo PO create error: {e}")
+                    track_job(job_id, started)
+                    if started:
+                        st.info(f"PO job {job_id[:8]} queued – progress below.")
+                    else:
+                        explain_existing_job(job_id, "These lines")
 
     st.markdown("---")
     show_rfq = st.checkbox("Show Existing RFQs in Odoo", value=False)
@@ -771,12 +1073,80 @@ with tab_log:
     if show_rfq:
         st.markdown("### Existing RFQs in Odoo")
         if ODOO_URL and ODOO_DB and ODOO_USERNAME and ODOO_API_KEY and st.session_state.company_id:
+            f1, f2, f3 = st.columns([1.2, 1.2, 1])
+            with f1:
+                vendor_filter_names = ["All vendors"] + [v["name"] for v in vendors]
+                rfq_vendor_name = st.selectbox("Vendor filter", vendor_filter_names, key="rfq_vendor")
+                rfq_vendor_id = next(
+                    (v["id"] for v in vendors if v["name"] == rfq_vendor_name), None
+                )
+            with f2:
+                rfq_dates = st.date_input("Order date range", value=(), key="rfq_dates")
+            with f3:
+                rfq_states = st.multiselect(
+                    "State", RFQ_STATES, default=["draft", "sent"], key="rfq_states"
+                )
+            domain = rfq_domain(
+                st.session_state.company_id,
+                rfq_vendor_id,
+                rfq_dates[0] if len(rfq_dates) > 0 else None,
+                rfq_dates[1] if len(rfq_dates) > 1 else None,
+                rfq_states or ["draft", "sent"],
+            )
+            use_snapshot = st.toggle(
+                "Incremental local snapshot (fetch only changed RFQs)",
+                key="rfq_snapshot_mode",
+            )
+            refresh_rfq = st.button("🔄 Refresh RFQs", key="refresh_rfq")
             try:
                 db, uid, password, models = get_odoo_connection(
                     ODOO_URL, ODOO_DB, ODOO_USERNAME, ODOO_API_KEY
                 )
-                rfqs = load_rfq(models, db, uid, password, st.session_state.company_id)
-                rfq_df = pd.DataFrame(rfqs)
+                if use_snapshot:
+                    snapshots = st.session_state.rfq_snapshots
+                    snapshot = snapshots.get(st.session_state.company_id)
+                    if snapshot is None:
+                        snapshot = RfqSnapshot(st.session_state.company_id)
+                        snapshots[st.session_state.company_id] = snapshot
+                    if refresh_rfq or snapshot.age() is None or snapshot.age() > RFQ_SNAPSHOT_TTL:
+                        snapshot.refresh(models, db, uid, password)
+                    stats = snapshot.stats
+                    st.caption(
+                        f"Snapshot: {stats['total']} RFQs · last refresh fetched "
+                        f"{stats['fetched']}, removed {stats['removed']} in {stats['seconds']}s"
+                    )
+                    matching = snapshot.filtered(
+                        rfq_vendor_id,
+                        rfq_dates[0] if len(rfq_dates) > 0 else None,
+                        rfq_dates[1] if len(rfq_dates) > 1 else None,
+                        rfq_states or ["draft", "sent"],
+                    )
+                    total_rfqs = len(matching)
+                    total_pages = max(1, -(-total_rfqs // RFQ_PAGE_SIZE))
+                else:
+                    store = st.session_state.get("rfq_store")
+                    if store is None or store.conn != (models, db, uid, password):
+                        store = RfqPageStore(models, db, uid, password)
+                        st.session_state.rfq_store = store
+                    if refresh_rfq:
+                        store.invalidate()
+                    total_rfqs = store.count(domain)
+                    total_pages = store.page_count(domain)
+
+                p1, p2 = st.columns([1, 3])
+                with p1:
+                    page_no = st.number_input(
+                        "Page", min_value=1, max_value=total_pages, value=1, step=1, key="rfq_page"
+                    )
+                with p2:
+                    st.caption(f"Page {page_no} of {total_pages} · {total_rfqs} RFQs")
+
+                if use_snapshot:
+                    start = (page_no - 1) * RFQ_PAGE_SIZE
+                    rfq_df = matching.iloc[start:start + RFQ_PAGE_SIZE]
+                else:
+                    rfq_df = pd.DataFrame(store.page(domain, page_no - 1))
+                    store.prefetch(domain, page_no)
                 st.session_state.rfq_df = rfq_df
             except Exception as e:
                 st.error(f"RFQ load error: {e}")
@@ -786,12 +1156,8 @@ with tab_log:
 
         if rfq_df is not None and not rfq_df.empty:
             disp_df = rfq_df.copy()
-            disp_df["vendor"] = disp_df["partner_id"].apply(
-                lambda x: x[1] if isinstance(x, list) and len(x) > 1 else ""
-            )
-            disp_df["company"] = disp_df["company_id"].apply(
-                lambda x: x[1] if isinstance(x, list) and len(x) > 1 else ""
-            )
+            if "vendor" not in disp_df.columns:
+                disp_df = with_display_columns(disp_df)
             disp_df_show = disp_df[["id", "name", "vendor", "date_order", "amount_total", "state", "company"]]
 
             rfq_event = st.dataframe(
@@ -801,12 +1167,18 @@ with tab_log:
                 selection_mode="multi-row",
             )
 
+            # Only what is ticked in the visible page counts: a selection made
+            # on another page or under another filter is dropped, never
+            # confirmed unseen.
             rfq_selected_rows = rfq_event.selection.rows if rfq_event is not None else []
-            if rfq_selected_rows:
-                st.session_state.selected_rfq_ids = disp_df_show.iloc[rfq_selected_rows]["id"].tolist()
+            st.session_state.selected_rfq_ids = disp_df_show.iloc[rfq_selected_rows]["id"].tolist()
 
             st.caption(f"Selected RFQs: {len(st.session_state.selected_rfq_ids)}")
 
+            confirm_batch_size = st.number_input(
+                "Confirm batch size", min_value=1, max_value=500,
+                value=CONFIRM_BATCH_SIZE, step=1, key="rfq_confirm_batch",
+            )
             if st.button("✅ Confirm selected RFQs in Odoo"):
                 if not st.session_state.selected_rfq_ids:
                     st.warning("Select at least one RFQ to confirm.")
@@ -819,13 +1191,35 @@ with tab_log:
                             "allowed_company_ids": [st.session_state.company_id],
                             "company_id": st.session_state.company_id,
                         }
-                        confirm_rfq(models, db, uid, password, st.session_state.selected_rfq_ids, ctx)
-                        st.success(f"Confirmed {len(st.session_state.selected_rfq_ids)} RFQs.")
+                        rfq_ids = sorted(st.session_state.selected_rfq_ids)
+                        confirm_key = hashlib.sha1(
+                            json.dumps(["rfq_confirm", st.session_state.company_id, rfq_ids]).encode("utf-8")
+                        ).hexdigest()
+                        job_id, started = get_job_runner().submit(
+                            "rfq_confirm",
+                            confirm_key,
+                            {"company_id": st.session_state.company_id, "rfqs": len(rfq_ids)},
+                            {
+                                "conn": (db, uid, password, models),
+                                "ctx": ctx,
+                                "rfq_ids": rfq_ids,
+                                "batch_size": int(confirm_batch_size),
+                            },
+                        )
+                        track_job(job_id, started)
+                        if started:
+                            st.info(f"Confirm job {job_id[:8]} queued – progress below.")
+                        else:
+                            explain_existing_job(job_id, "These RFQs")
                     except Exception as e:
                         st.error(f"Odoo RFQ confirm error: {e}")
         else:
+            st.session_state.selected_rfq_ids = []
             st.info("No RFQs found (draft/sent) for this company.")
 
+    render_jobs_panel()
+
+    timing_panel = st.empty()
     st.markdown("</div>", unsafe_allow_html=True)
 
 # ========= STEP 1: scan dataframe (only selected rows) =========
@@ -866,34 +1260,41 @@ if create_po_clicked:
         st.error(f"{tr('err_missing_cols')}: {missing_cols}")
         st.stop()
 
-    lines = []
-    log_messages = []
-
-    selected_idx_list = st.session_state.selected_rows or []
-
-    for idx in selected_idx_list:
-        row = df.iloc[idx]
-        if pd.isna(row[qty_col]) or pd.isna(row[price_col]):
-            continue
-        name = str(row[name_col])
-        qty = float(row[qty_col])
-        price = float(row[price_col])
-
-        line_vals = {
-            "name": name,
-            "product_qty": qty,
-            "price_unit": price,
-        }
-        if st.session_state.distribution_id:
-            line_vals["analytic_distribution_id"] = st.session_state.distribution_id
-
-        lines.append(line_vals)
-        log_messages.append(
-            f"✅ Row {idx+2}: {name} → added (selected line, without product_id)"
+    with span("stage", "build_order_lines") as build_span:
+        lines, log_messages = build_order_lines(
+            df, st.session_state.selected_rows, st.session_state.distribution_id
+        )
+        build_span["rows"] = len(lines)
+
+    try:
+        line_names = [line["name"] for line in lines]
+        with span("stage", "product_lookup", catalog=product_catalog is not None):
+            if product_catalog is not None:
+                product_index = product_catalog.match(line_names)
+            else:
+                product_index = resolve_products(models, db, uid, password, line_names, ctx)
+    except Exception as e:
+        st.error(f"Odoo product lookup error: {e}")
+        st.stop()
+    line_keys = header_keys(
+        df, log_messages.row_positions,
+        st.session_state.vendor_id, st.session_state.picking_type_id,
+    )
+    with span("stage", "split_matched"):
+        lines, missing_products = split_matched(lines, log_messages, product_index)
+    line_keys = [
+        key for key, product_id in zip(line_keys, log_messages.product_ids)
+        if product_id is not None
+    ]
+    if missing_products and product_catalog is not None:
+        fuzzy_index = get_fuzzy_index(
+            ODOO_URL, ODOO_DB, product_catalog.meta().get("last_sync")
         )
+        for missing in missing_products:
+            missing["did_you_mean"] = suggestion_label(fuzzy_index.query(missing["model"]))
 
-    st.session_state.po_lines = lines
-    st.session_state.po_missing_products = []
+    st.session_state.po_lines = LineStore.from_lines(lines, line_keys)
+    st.session_state.po_missing_products = missing_products
     st.session_state.company_snapshot = {
         "company_id": company_id,
         "company_name": company_name,
@@ -906,5 +1307,30 @@ if create_po_clicked:
         "picking_type_id": st.session_state.picking_type_id,
         "distribution_id": st.session_state.distribution_id,
     }
-    st.session_state.log_messages = log_messages
+    st.session_state.log_messages = log_messages.tail(LOG_CAPACITY)
+    st.session_state.po_job_key = uuid.uuid4().hex
+    # Checkpoints belong to the previous key's jobs.
+    st.session_state.po_checkpoint = None
+    st.session_state.po_checkpoints = None
     st.session_state.current_missing_index = 0
+
+# ========= TIMING PANEL =========
+if rerun_trace is not None:
+    session_trace = st.session_state.trace
+    session_trace.finish_rerun(rerun_trace)
+    with timing_panel.container():
+        with st.expander("⏱ Timings · this rerun and session", expanded=False):
+            st.caption(
+                f"This rerun: {rerun_trace.total_ms():,.0f} ms, "
+                f"{len(rerun_trace.spans)} traced spans"
+            )
+            if rerun_trace.spans:
+                st.dataframe(pd.DataFrame(rerun_trace.spans), use_container_width=True)
+            st.markdown("**Session totals**")
+            st.dataframe(pd.DataFrame(session_trace.summary()), use_container_width=True)
+            st.download_button(
+                "⬇️ Download traces (JSON lines)",
+                data=session_trace.to_jsonl(),
+                file_name="swag_po_traces.jsonl",
+                mime="application/x-ndjson",
+            )
@@ -0,0 +1,189 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from engine import SOURCES, connect, parse_path, source_for_path
+from po_create import create_purchase_orders, group_purchase_orders, header_keys
+from po_dedup import DUPLICATE_LOOKBACK_DAYS, MERGE_RULES, aggregate_lines, find_duplicate_pos
+from po_lines import build_order_lines
+from product_resolver import ProductIndex, resolve_products, split_matched
+from session_store import LineStore
+
+# ========= HEADLESS BATCH MODE =========
+# Usage: python batch.py INPUT [INPUT ...] --company-id 1 --vendor-id 7
+#                        --picking-type-id 3 [--report summary.csv] [--dry-run]
+#                        [--no-check-duplicates]
+# INPUT is a directory or a glob of Excel / PDF / CSV / Parquet files. Files
+# are parsed in parallel worker processes; as each one finishes, its lines are
+# built, matched to products and created as draft POs (split by vendor /
+# operation type / distribution like the app) on a bounded thread pool. As in
+# the app, a file whose POs match the vendor's recent POs line for line is
+# reported as "duplicate" and not created.
+# Odoo credentials come from SWAG_ODOO_URL / _DB / _USERNAME / _API_KEY.
+
+REPORT_FIELDS = [
+    "file", "source", "status", "rows", "lines", "matched", "missing", "merged", "pos",
+    "po_ids", "duplicate_of", "pdf_total", "parse_s", "build_s", "create_s", "error",
+]
+
+
+def collect_files(inputs):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = sorted(os.path.join(item, name) for name in os.listdir(item))
+        else:
+            candidates = sorted(glob.glob(item))
+        paths.extend(
+            p for p in candidates
+            if os.path.isfile(p) and os.path.splitext(p)[1].lower() in SOURCES
+        )
+    return list(dict.fromkeys(paths))
+
+
+def parse_file(path):
+    # Runs in a worker process; errors come back as data, not exceptions.
+    start = time.perf_counter()
+    source = source_for_path(path)
+    try:
+        df, pdf_total, _ = parse_path(path)
+    except Exception as e:
+        return {"file": path, "source": source, "status": "parse_error", "error": str(e),
+                "parse_s": round(time.perf_counter() - start, 3)}, None
+    return {"file": path, "source": source, "rows": len(df), "pdf_total": pdf_total,
+            "parse_s": round(time.perf_counter() - start, 3)}, df
+
+
+def process_file(row, df, args, conn, product_index):
+    start = time.perf_counter()
+    lines, log = build_order_lines(df, np.arange(len(df)), args.distribution_id)
+    keys = header_keys(df, log.row_positions, args.vendor_id, args.picking_type_id)
+    row["lines"] = len(lines)
+    if conn is None:
+        row.update(status="parsed", build_s=round(time.perf_counter() - start, 3))
+        return row
+
+    db, uid, password, models = conn
+    ctx = {"allowed_company_ids": [args.company_id], "company_id": args.company_id}
+    resolve_products(models, db, uid, password, [line["name"] for line in lines], ctx,
+                     index=product_index)
+    matched, missing = split_matched(lines, log, product_index)
+    keys = [k for k, product_id in zip(keys, log.product_ids) if product_id is not None]
+    store, merged = aggregate_lines(LineStore.from_lines(matched, keys), args.merge_rule)
+    row.update(matched=len(matched), missing=len(missing), merged=merged,
+               build_s=round(time.perf_counter() - start, 3))
+    if not matched:
+        row.update(status="no_matched_lines")
+        return row
+
+    groups = group_purchase_orders(store, store.keys())
+    if args.check_duplicates:
+        duplicates = find_duplicate_pos(models, db, uid, password, groups, ctx)
+        if duplicates:
+            row.update(
+                status="duplicate",
+                duplicate_of=" ".join(sorted({n for names in duplicates.values() for n in names})),
+            )
+            return row
+
+    results, seconds = create_purchase_orders(
+        models, db, uid, password, groups, args.company_id, ctx, max_workers=1,
+    )
+    errors = [r["error"] for r in results if r["error"]]
+    row.update(
+        pos=len(results) - len(errors),
+        po_ids=" ".join(str(r["po_id"]) for r in results if r["po_id"]),
+        create_s=round(seconds, 3),
+        status="error" if errors else "created",
+        error=errors[0] if errors else "",
+    )
+    return row
+
+
+def write_report(rows, path):
+    if path.lower().endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, default=str)
+        return
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def connect_from_env(args):
+    url = os.environ.get("SWAG_ODOO_URL")
+    db = os.environ.get("SWAG_ODOO_DB")
+    username = os.environ.get("SWAG_ODOO_USERNAME")
+    api_key = os.environ.get("SWAG_ODOO_API_KEY")
+    if not (url and db and username and api_key):
+        sys.exit("Set SWAG_ODOO_URL, SWAG_ODOO_DB, SWAG_ODOO_USERNAME and SWAG_ODOO_API_KEY "
+                 "(or use --dry-run).")
+    try:
+        return connect(url, db, username, api_key, pool_size=args.concurrency)
+    except Exception as e:
+        sys.exit(f"Odoo connection failed: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create draft POs from a folder of SWAG files")
+    parser.add_argument("inputs", nargs="+", help="directories or glob patterns")
+    parser.add_argument("--company-id", type=int)
+    parser.add_argument("--vendor-id", type=int, help="fallback when a file has no partner_id column")
+    parser.add_argument("--picking-type-id", type=int)
+    parser.add_argument("--distribution-id", type=int)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parse processes")
+    parser.add_argument("--concurrency", type=int, default=4, help="files talking to Odoo at once")
+    parser.add_argument("--report", default="swag_batch_report.csv", help=".csv or .json")
+    parser.add_argument("--merge-rule", choices=list(MERGE_RULES), default="none",
+                        help="merge duplicate lines before creating POs")
+    parser.add_argument("--check-duplicates", action=argparse.BooleanOptionalAction, default=True,
+                        help="skip files already ordered from the vendor in the last "
+                             f"{DUPLICATE_LOOKBACK_DAYS} days")
+    parser.add_argument("--dry-run", action="store_true", help="parse and build lines only")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.inputs)
+    if not files:
+        sys.exit("No Excel / PDF / CSV / Parquet files found.")
+    if not args.dry_run and not (args.company_id and args.vendor_id and args.picking_type_id):
+        parser.error("--company-id, --vendor-id and --picking-type-id are required")
+
+    conn = None if args.dry_run else connect_from_env(args)
+    product_index = ProductIndex()
+    start = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(max_workers=args.workers) as parse_pool, \
+            ThreadPoolExecutor(max_workers=args.concurrency) as odoo_pool:
+        parsed = [parse_pool.submit(parse_file, path) for path in files]
+        pending = []
+        for future in as_completed(parsed):
+            row, df = future.result()
+            if df is None:
+                rows.append(row)
+                continue
+            pending.append((row, odoo_pool.submit(process_file, row, df, args, conn, product_index)))
+        for row, future in pending:
+            try:
+                rows.append(future.result())
+            except Exception as e:
+                row.update(status="error", error=str(e))
+                rows.append(row)
+
+    rows.sort(key=lambda r: files.index(r["file"]))
+    write_report(rows, args.report)
+    failed = sum(1 for r in rows if r.get("status") not in ("created", "parsed"))
+    print(f"{len(rows)} files in {time.perf_counter() - start:.1f}s, {failed} not created; "
+          f"report: {args.report}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+# ========= ENGINE IMPORT TIME =========
+# Usage: python benchmarks/bench_import.py
+# Imports engine in fresh interpreters and reports the median wall time plus
+# which heavy packages the import pulled in (there should be none).
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["streamlit", "pandas", "numpy", "pdfplumber", "openpyxl", "pyarrow", "PIL"]
+PROBE = (
+    "import sys, time; t = time.perf_counter(); import engine; "
+    "ms = (time.perf_counter() - t) * 1000; "
+    f"print(ms, ','.join(m for m in {HEAVY!r} if m in sys.modules))"
+)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    samples, loaded = [], ""
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+        samples.append(float(out[0]))
+        loaded = out[1] if len(out) > 1 else ""
+    samples.sort()
+    print(f"import engine: {samples[len(samples) // 2]:.1f} ms median over {runs} runs")
+    print(f"heavy modules loaded: {loaded or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from line_tokenizer import tokenize_line  # noqa: E402
+
+# ========= LINE TOKENIZER MICRO-BENCHMARK =========
+# Usage: python benchmarks/bench_tokenizer.py [n_lines]
+# Compares the original per-line regex code with line_tokenizer on a
+# synthetic SWAG invoice and prints lines/second for both.
+
+
+def legacy_parse_line(line):
+    if "SR" not in line:
+        return None
+    try:
+        price_match = re.findall(r"SR\s*([\d,]+\.?\d*)", line)
+        if len(price_match) < 1:
+            return None
+        price_str = price_match[-1].replace(",", "")
+        price = float(price_str)
+
+        qty_match = re.search(rf"{price_str}[^\d]+(\d+)", line)
+        if not qty_match:
+            return None
+        qty = float(qty_match.group(1))
+
+        tokens = re.findall(r"[A-Za-z0-9\-]+", line)
+        model_candidates = [t for t in tokens if re.search(r"[A-Za-z]", t)]
+        model = model_candidates[-1] if model_candidates else line.strip()
+    except Exception:
+        return None
+    return model, qty, price
+
+
+def synthetic_invoice_lines(n_lines, seed=42):
+    rnd = random.Random(seed)
+    lines = []
+    for i in range(n_lines):
+        if i % 10 == 0:
+            lines.append(f"Page {i // 40 + 1} - SWAG Sales Invoice - VAT No 3000{i:06d}")
+            continue
+        model = f"TX{rnd.randint(1000, 9999)}-{rnd.choice('ABCDEFG')}"
+        price = rnd.randint(5, 900) + rnd.choice([0, 0.25, 0.5, 0.75])
+        qty = rnd.randint(1, 48)
+        lines.append(f"{i} Ladies Shirt SR {price:,.2f} {qty} {price * qty:,.2f} {model}")
+    return lines
+
+
+def run(fn, lines):
+    start = time.perf_counter()
+    for line in lines:
+        fn(line)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main():
+    n_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lines = synthetic_invoice_lines(n_lines)
+    # Warm-up so both sides start with a populated re module cache.
+    run(legacy_parse_line, lines[:1000])
+    run(tokenize_line, lines[:1000])
+
+    before = run(legacy_parse_line, lines)
+    after = run(tokenize_line, lines)
+    print(f"lines:  {n_lines}")
+    print(f"before: {before:,.0f} lines/s")
+    print(f"after:  {after:,.0f} lines/s")
+    print(f"speed-up: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
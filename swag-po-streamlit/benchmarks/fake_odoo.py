@@ -0,0 +1,165 @@
+import itertools
+import threading
+import time
+from socketserver import ThreadingMixIn
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+# ========= FAKE ODOO XML-RPC SERVER =========
+# In-memory stand-in for the two Odoo endpoints the app talks to
+# (/xmlrpc/2/common and /xmlrpc/2/object). It understands authenticate and
+# execute_kw with search, search_read, search_count, create, write and
+# button_confirm on flat records, which is enough to time the real client
+# code. Every call sleeps `latency` seconds to mimic the network round trip.
+
+FAKE_UID = 2
+
+
+class _Handler(SimpleXMLRPCRequestHandler):
+    rpc_paths = ("/xmlrpc/2/common", "/xmlrpc/2/object")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadedServer(ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+
+
+def _matches(record, domain):
+    for field, op, value in domain:
+        current = record.get(field)
+        if isinstance(current, list) and current:
+            current = current[0]  # many2one stored as [id, name]
+        if op == "=" and current != value:
+            return False
+        if op == "!=" and current == value:
+            return False
+        if op == "in" and current not in value:
+            return False
+        if op == ">" and not (current is not None and current > value):
+            return False
+        if op == ">=" and not (current is not None and current >= value):
+            return False
+        if op == "<=" and not (current is not None and current <= value):
+            return False
+    return True
+
+
+class FakeOdoo:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.records = {}  # model -> {id: record}
+        self.calls = []    # (model, method) per execute_kw
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = None
+
+    # ----- data -----
+    def _now(self):
+        return time.strftime("%Y-%m-%d %H:%M:%S")
+
+    def insert(self, model, vals):
+        with self._lock:
+            record_id = next(self._ids)
+            record = {"id": record_id, "write_date": self._now(), **vals}
+            self.records.setdefault(model, {})[record_id] = record
+        lines = record.pop("order_line", None)
+        if lines:
+            self._add_lines(record_id, lines)
+        return record_id
+
+    def _add_lines(self, order_id, commands):
+        for command in commands:
+            if command[0] == 0:
+                self.insert("purchase.order.line", {**command[2], "order_id": order_id})
+
+    def seed_products(self, names):
+        return [self.insert("product.product", {"default_code": n, "name": n, "barcode": False})
+                for n in names]
+
+    def seed_rfqs(self, count, partner=(7, "SWAG Trading"), company=(1, "SWAG")):
+        return [
+            self.insert(
+                "purchase.order",
+                {
+                    "name": f"P{n:05d}",
+                    "partner_id": list(partner),
+                    "company_id": list(company),
+                    "date_order": f"2024-01-{n % 28 + 1:02d} 10:00:00",
+                    "amount_total": 100.0 + n,
+                    "state": "draft",
+                },
+            )
+            for n in range(count)
+        ]
+
+    def _search(self, model, domain):
+        with self._lock:
+            rows = list(self.records.get(model, {}).values())
+        return [r for r in rows if _matches(r, domain)]
+
+    # ----- RPC -----
+    def authenticate(self, db, username, password, user_agent_env):
+        time.sleep(self.latency)
+        return FAKE_UID
+
+    def version(self):
+        return {"server_version": "fake"}
+
+    def execute_kw(self, db, uid, password, model, method, args, kwargs=None):
+        time.sleep(self.latency)
+        kwargs = kwargs or {}
+        with self._lock:
+            self.calls.append((model, method))
+
+        if method in ("search", "search_read", "search_count"):
+            rows = self._search(model, args[0] if args else [])
+            if method == "search_count":
+                return len(rows)
+            offset = kwargs.get("offset", 0)
+            limit = kwargs.get("limit")
+            rows = rows[offset:offset + limit if limit else None]
+            if method == "search":
+                return [r["id"] for r in rows]
+            fields = kwargs.get("fields")
+            return [
+                {"id": r["id"], **{f: r.get(f, False) for f in fields}} if fields else dict(r)
+                for r in rows
+            ]
+        if method == "create":
+            vals = args[0]
+            if isinstance(vals, list):
+                return [self.insert(model, v) for v in vals]
+            return self.insert(model, vals)
+        if method == "write":
+            ids, vals = args
+            vals = dict(vals)
+            lines = vals.pop("order_line", None)
+            with self._lock:
+                for record_id in ids:
+                    self.records[model][record_id].update(vals, write_date=self._now())
+            for record_id in ids:
+                if lines:
+                    self._add_lines(record_id, lines)
+            return True
+        if method == "button_confirm":
+            with self._lock:
+                for record_id in args[0]:
+                    self.records[model][record_id].update(state="purchase", write_date=self._now())
+            return True
+        raise ValueError(f"fake Odoo does not implement {model}.{method}")
+
+    # ----- server lifecycle -----
+    def start(self, host="127.0.0.1", port=0):
+        self._server = _ThreadedServer(
+            (host, port), requestHandler=_Handler, allow_none=True, logRequests=False
+        )
+        self._server.register_instance(self)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
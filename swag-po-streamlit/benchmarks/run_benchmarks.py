@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from fake_odoo import FAKE_UID, FakeOdoo  # noqa: E402
+from ingest import read_excel_lines  # noqa: E402
+from odoo_client import OdooClient  # noqa: E402
+from pdf_parser import parse_swag_pdf  # noqa: E402
+from po_lines import build_order_lines  # noqa: E402
+from rfq import confirm_rfq, load_rfq, rfq_domain  # noqa: E402
+from synthetic_docs import swag_excel_bytes, swag_pdf_bytes  # noqa: E402
+
+# ========= BENCHMARK SUITE =========
+# Usage: python benchmarks/run_benchmarks.py [--sizes 500,5000] [--latency 0.02]
+#                                            [--repeat 5] [--out report.json]
+# Runs seeded scenarios for parsing, line building and RFQ round trips against
+# a local fake Odoo and writes one JSON report. parse_swag_pdf is what the
+# app's parse_swag_pdf_to_df wraps (minus the Streamlit session write).
+
+DB, API_KEY = "bench", "bench-key"
+
+
+def measure(fn, repeat, rows=None, setup=None):
+    samples = []
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    result = {
+        "repeat": repeat,
+        "min_s": round(min(samples), 6),
+        "median_s": round(statistics.median(samples), 6),
+        "max_s": round(max(samples), 6),
+    }
+    if rows:
+        result["rows"] = rows
+        result["rows_per_sec"] = round(rows / statistics.median(samples))
+    return result
+
+
+def parsing_scenarios(sizes, repeat):
+    report = {}
+    for n in sizes:
+        pdf = swag_pdf_bytes(n)
+        df, _ = parse_swag_pdf(pdf)
+        report[f"parse_swag_pdf[{n}]"] = measure(lambda: parse_swag_pdf(pdf), repeat, rows=n)
+        report[f"parse_swag_pdf[{n}]"]["parsed_rows"] = len(df)
+
+        xlsx = swag_excel_bytes(n)
+        report[f"read_excel_lines[{n}]"] = measure(lambda: read_excel_lines(xlsx), repeat, rows=n)
+
+        lines_df, _ = read_excel_lines(xlsx)
+        selected = np.arange(len(lines_df))
+        report[f"build_order_lines[{n}]"] = measure(
+            lambda: build_order_lines(lines_df, selected, 3), repeat, rows=n
+        )
+    return report
+
+
+def odoo_scenarios(latency, repeat, rfq_count=500, page_size=50, confirm_batch=20):
+    fake = FakeOdoo(latency=latency)
+    url = fake.start()
+    client = OdooClient(url, pool_size=4)
+    try:
+        uid = client.authenticate(DB, "bench", API_KEY)
+        assert uid == FAKE_UID
+        fake.seed_rfqs(rfq_count)
+        domain = rfq_domain(1)
+        report = {
+            f"load_rfq[page={page_size}]": measure(
+                lambda: load_rfq(client, DB, uid, API_KEY, limit=page_size, domain=domain),
+                repeat, rows=page_size,
+            ),
+            f"load_rfq[all={rfq_count}]": measure(
+                lambda: load_rfq(client, DB, uid, API_KEY, limit=rfq_count, domain=domain),
+                repeat, rows=rfq_count,
+            ),
+            f"confirm_rfq[batch={confirm_batch}]": measure(
+                lambda ids: confirm_rfq(client, DB, uid, API_KEY, ids),
+                repeat, rows=confirm_batch,
+                setup=lambda: fake.seed_rfqs(confirm_batch),
+            ),
+        }
+        report["odoo_calls"] = len(fake.calls)
+        return report
+    finally:
+        client.close()
+        fake.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SWAG PO benchmark suite")
+    parser.add_argument("--sizes", default="200,2000", help="comma-separated line counts")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake Odoo seconds per call")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default=None, help="write the JSON report here")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    report = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "latency_s": args.latency,
+            "repeat": args.repeat,
+        },
+        "parsing": parsing_scenarios(sizes, args.repeat),
+        "odoo": odoo_scenarios(args.latency, args.repeat),
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
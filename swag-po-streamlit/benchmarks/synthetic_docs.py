@@ -0,0 +1,80 @@
+import io
+import random
+
+from bench_tokenizer import synthetic_invoice_lines
+
+# ========= SYNTHETIC SWAG DOCUMENTS =========
+# Seeded generators for invoice PDFs and Excel order sheets of any size. The
+# PDF is written by hand (one Helvetica text line per invoice line), so no
+# PDF library beyond the app's own pdfplumber is needed to run benchmarks.
+
+LINES_PER_PAGE = 60
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def swag_pdf_bytes(n_lines, seed=42, lines_per_page=LINES_PER_PAGE):
+    lines = synthetic_invoice_lines(n_lines, seed)
+    lines.append(f"Total SR {sum(range(n_lines)) * 1.0:,.2f}")
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then (page, content) pairs.
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for n, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * n, 5 + 2 * n
+        kids.append(f"{page_id} 0 R")
+        body = "BT /F1 8 Tf 10 TL 30 810 Td " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in page_lines
+        ) + " ET"
+        stream = body.encode("latin-1")
+        objects[content_id] = (
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode("latin-1")
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = out.tell()
+        out.write(b"%d 0 obj\n" % obj_id + objects[obj_id] + b"\nendobj\n")
+    xref = out.tell()
+    size = max(objects) + 1
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+    for obj_id in range(1, size):
+        out.write(b"%010d 00000 n \n" % offsets[obj_id])
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref))
+    return out.getvalue()
+
+
+def swag_excel_bytes(n_lines, seed=42, with_headers=False):
+    from openpyxl import Workbook
+
+    from pdf_parser import NAME_COL, PRICE_COL, QTY_COL
+
+    rnd = random.Random(seed)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([NAME_COL, QTY_COL, PRICE_COL] + (["partner_id"] if with_headers else []))
+    for _ in range(n_lines):
+        row = [
+            f"TX{rnd.randint(1000, 9999)}-{rnd.choice('ABCDEFG')}",
+            rnd.randint(1, 48),
+            rnd.randint(5, 900) + rnd.choice([0, 0.25, 0.5, 0.75]),
+        ]
+        if with_headers:
+            row.append(rnd.choice([7, 8, 9]))
+        ws.append(row)
+    out = io.BytesIO()
+    wb.save(out)
+    return out.getvalue()
@@ -0,0 +1,124 @@
+import importlib
+import os
+import time
+
+# ========= ENGINE =========
+# Streamlit-free entry point to parsing, line building and the Odoo helpers,
+# for batch jobs, benchmarks and tests. The exported names resolve on first
+# access (PEP 562), so `import engine` loads no third-party package: pandas
+# comes with the first parse / build, pdfplumber only with a PDF and openpyxl
+# only with an Excel workbook.
+#
+#   import engine
+#   df, pdf_total, stats = engine.parse_file_bytes(data, engine.source_for_path(path))
+#   df, pdf_total, stats = engine.parse_path(path)  # Parquet / CSV read from disk
+#   lines, log = engine.build_order_lines(df, range(len(df)))
+
+SOURCES = {
+    ".xlsx": "excel",
+    ".xlsm": "excel",
+    ".xls": "excel",
+    ".pdf": "pdf",
+    ".csv": "csv",
+    ".parquet": "parquet",
+}
+
+_EXPORTS = {
+    "NAME_COL": "pdf_parser",
+    "QTY_COL": "pdf_parser",
+    "PRICE_COL": "pdf_parser",
+    "LINE_COLUMNS": "pdf_parser",
+    "parse_swag_pdf": "pdf_parser",
+    "TABULAR_READERS": "ingest",
+    "read_excel_lines": "ingest",
+    "read_csv_lines": "ingest",
+    "read_parquet_lines": "ingest",
+    "DIST_COL": "po_lines",
+    "build_order_lines": "po_lines",
+    "OdooClient": "odoo_client",
+    "run_concurrently": "odoo_client",
+    "ProductIndex": "product_resolver",
+    "resolve_products": "product_resolver",
+    "split_matched": "product_resolver",
+    "build_po_vals": "po_create",
+    "header_keys": "po_create",
+    "group_purchase_orders": "po_create",
+    "create_purchase_orders": "po_create",
+    "create_large_purchase_order": "po_create",
+    "new_checkpoint": "po_create",
+    "resume_checkpoint": "po_create",
+    "MERGE_RULES": "po_dedup",
+    "aggregate_lines": "po_dedup",
+    "line_set_hash": "po_dedup",
+    "find_duplicate_pos": "po_dedup",
+    "rfq_domain": "rfq",
+    "load_rfq": "rfq",
+    "confirm_rfq": "rfq",
+    "confirm_rfqs_batched": "rfq",
+}
+
+__all__ = ["SOURCES", "source_for_path", "parse_file_bytes", "parse_path", "connect", *_EXPORTS]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+def source_for_path(path):
+    return SOURCES.get(os.path.splitext(path)[1].lower())
+
+
+def parse_file_bytes(file_bytes: bytes, source: str):
+    # Returns (df, pdf_total, stats); pdf_total is None for tabular sources.
+    if source in ("excel", "csv", "parquet"):
+        from ingest import TABULAR_READERS
+
+        df, stats = TABULAR_READERS[source](file_bytes)
+        return df, None, stats
+    if source != "pdf":
+        raise ValueError(f"unsupported source: {source}")
+    from pdf_parser import parse_swag_pdf
+
+    start = time.perf_counter()
+    df, pdf_total = parse_swag_pdf(file_bytes)
+    seconds = time.perf_counter() - start
+    stats = {
+        "rows": len(df),
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(len(df) / seconds) if seconds > 0 else None,
+    }
+    return df, pdf_total, stats
+
+
+def parse_path(path):
+    # Parquet is memory-mapped and CSV streamed straight from the file; the
+    # other sources are read into memory and parsed as uploaded bytes.
+    source = source_for_path(path)
+    if source in ("csv", "parquet"):
+        from ingest import TABULAR_READERS
+
+        df, stats = TABULAR_READERS[source](path)
+        return df, None, stats
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+    return parse_file_bytes(file_bytes, source)
+
+
+def connect(url, db, username, api_key, pool_size=4, timeout=60):
+    # Same tuple as the app's get_odoo_connection: (db, uid, password, models).
+    from odoo_client import OdooClient
+
+    models = OdooClient(url, pool_size=pool_size, timeout=timeout)
+    uid = models.authenticate(db, username, api_key)
+    if not uid:
+        raise Exception("Authentication failed! URL / DB / username / API key check karo.")
+    return db, uid, api_key, models
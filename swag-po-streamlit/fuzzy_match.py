@@ -0,0 +1,98 @@
+import re
+from collections import Counter, defaultdict
+
+# ========= FUZZY SKU MATCHER =========
+# Character-trigram inverted index over catalog codes / names. A query only
+# touches the postings of its own trigrams and candidates are ranked by Dice
+# similarity, so near-miss model codes (stray suffixes, O/0 slips) still
+# find the right product without a round trip to Odoo.
+
+_NON_ALNUM_RE = re.compile(r"[^0-9A-Z]+")
+
+# Trigrams shared by more than this share of keys carry almost no signal and
+# dominate query time on big catalogs, so they are not used to find
+# candidates. Candidate search also stops once SCAN_BUDGET posting entries
+# were read, but always reads the MIN_GRAMS_SCANNED rarest postings.
+MAX_POSTING_SHARE = 0.05
+SCAN_BUDGET = 2000
+MIN_GRAMS_SCANNED = 2
+SHORTLIST_SIZE = 50
+
+
+def normalize_code(value):
+    return _NON_ALNUM_RE.sub("", str(value).upper())
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    def __init__(self, products=()):
+        self.keys = []        # normalized key per entry
+        self.products = []    # product dict per entry
+        self.postings = defaultdict(list)
+        for product in products:
+            self.add(product)
+
+    def add(self, product):
+        seen = set()
+        for field in ("default_code", "barcode", "name"):
+            key = normalize_code(product.get(field) or "")
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            grams = trigrams(key)
+            entry = len(self.keys)
+            self.keys.append(key)
+            self.products.append(product)
+            for gram in grams:
+                self.postings[gram].append(entry)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def query(self, text, limit=3, min_score=0.4):
+        key = normalize_code(text)
+        if not key:
+            return []
+        grams = trigrams(key)
+        max_posting = max(50, int(len(self.keys) * MAX_POSTING_SHARE))
+
+        # Candidates come from the query's rarest trigrams, within a budget
+        # of postings scanned; common trigrams ("  T", " TX") add no signal.
+        postings = sorted(
+            (p for p in (self.postings.get(g) for g in grams) if p), key=len
+        )
+        shared = Counter()
+        scanned = 0
+        for n, posting in enumerate(postings):
+            if n >= MIN_GRAMS_SCANNED and (
+                len(posting) > max_posting or scanned + len(posting) > SCAN_BUDGET
+            ):
+                break
+            shared.update(posting)
+            scanned += len(posting)
+
+        # The shortlist is re-scored with full trigram sets, so Dice is exact
+        # (an identical code scores 1.0) no matter which trigrams were skipped.
+        best = {}
+        for entry, _ in shared.most_common(SHORTLIST_SIZE):
+            entry_grams = trigrams(self.keys[entry])
+            score = 2.0 * len(grams & entry_grams) / (len(grams) + len(entry_grams))
+            if score < min_score:
+                continue
+            product = self.products[entry]
+            # One product may be indexed under several keys; keep its best.
+            if score > best.get(product["id"], (0.0, None))[0]:
+                best[product["id"]] = (score, product)
+
+        ranked = sorted(best.values(), key=lambda item: -item[0])[:limit]
+        return [(product, round(score, 3)) for score, product in ranked]
+
+
+def suggestion_label(candidates):
+    return ", ".join(
+        f"{p.get('default_code') or p.get('name')} ({score:.2f})" for p, score in candidates
+    )
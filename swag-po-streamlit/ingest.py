@@ -0,0 +1,170 @@
+import io
+import math
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from pdf_parser import LINE_COLUMNS, NAME_COL, PRICE_COL, QTY_COL
+from po_create import PICKING_COL, VENDOR_COL
+from po_lines import DIST_COL
+
+# ========= EXCEL INGESTION =========
+# Only the order_line columns (plus the optional per-row header columns) are
+# ever used, so workbooks are read in streaming read-only mode, projected to
+# those columns up front and coerced to their final dtypes while reading.
+# python-calamine is used instead of openpyxl when it is installed.
+
+PROJECTED_COLUMNS = LINE_COLUMNS + [DIST_COL, VENDOR_COL, PICKING_COL]
+NUMERIC_COLUMNS = {QTY_COL, PRICE_COL, DIST_COL, VENDOR_COL, PICKING_COL}
+
+XLSX_MAGIC = b"PK\x03\x04"
+
+try:
+    import python_calamine  # noqa: F401
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
+
+def normalize_line_columns(df: pd.DataFrame) -> pd.DataFrame:
+    if NAME_COL in df.columns:
+        df[NAME_COL] = df[NAME_COL].astype(str)
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def _to_float(value):
+    if isinstance(value, bool):
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return math.nan
+    return math.nan
+
+
+def _read_xlsx_streaming(file_bytes, columns):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(io.BytesIO(file_bytes), read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        positions = {}
+        for i, name in enumerate(header):
+            if name in columns:
+                positions.setdefault(name, i)
+        data = {name: [] for name in positions}
+        n_rows = last_filled = 0
+        for row in rows:
+            n_rows += 1
+            if any(v is not None for v in row):
+                # Blank rows inside the sheet keep their slot (so "Row N" in
+                # the log still matches the sheet); trailing blanks are cut.
+                last_filled = n_rows
+            for name, i in positions.items():
+                value = row[i] if i < len(row) else None
+                if name in NUMERIC_COLUMNS:
+                    data[name].append(_to_float(value))
+                elif name == NAME_COL:
+                    data[name].append("nan" if value is None else str(value))
+                else:
+                    data[name].append(value)
+    finally:
+        wb.close()
+
+    return pd.DataFrame(
+        {
+            name: np.asarray(data[name][:last_filled], dtype="float64")
+            if name in NUMERIC_COLUMNS else data[name][:last_filled]
+            for name in columns if name in data
+        }
+    )
+
+
+def _stats(df, start):
+    seconds = time.perf_counter() - start
+    return {
+        "rows": len(df),
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(len(df) / seconds) if seconds > 0 else None,
+    }
+
+
+def read_excel_lines(file_bytes: bytes, columns=PROJECTED_COLUMNS):
+    start = time.perf_counter()
+    columns = list(columns)
+    wanted = set(columns)
+    if file_bytes[:4] != XLSX_MAGIC:
+        # Legacy .xls: no streaming reader, but still project columns.
+        df = pd.read_excel(io.BytesIO(file_bytes), usecols=lambda c: c in wanted)
+        df = normalize_line_columns(df)
+    elif HAS_CALAMINE:
+        df = pd.read_excel(
+            io.BytesIO(file_bytes), engine="calamine", usecols=lambda c: c in wanted
+        )
+        df = normalize_line_columns(df)
+    else:
+        df = _read_xlsx_streaming(file_bytes, columns)
+    return df, _stats(df, start)
+
+
+# ========= CSV / PARQUET INGESTION =========
+# Nightly ERP exports can be uploaded as-is. Parquet goes through Arrow with
+# column projection: a path is memory-mapped, uploaded bytes are wrapped
+# without copying. CSV is read in one pass with only the projected columns;
+# exports that are not UTF-8 (Excel "Save as CSV" on Windows) fall back to
+# cp1252.
+
+CSV_ENCODINGS = ("utf-8-sig", "cp1252")
+
+
+def read_parquet_lines(source, columns=PROJECTED_COLUMNS):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    start = time.perf_counter()
+    if isinstance(source, (str, os.PathLike)):
+        handle = pa.memory_map(source, "r")
+    else:
+        handle = pa.BufferReader(source)
+    with handle:
+        parquet = pq.ParquetFile(handle)
+        available = [c for c in columns if c in parquet.schema_arrow.names]
+        table = parquet.read(columns=available)
+    df = normalize_line_columns(table.to_pandas())
+    return df, _stats(df, start)
+
+
+def read_csv_lines(source, columns=PROJECTED_COLUMNS, encoding=None):
+    # encoding=None tries CSV_ENCODINGS in order.
+    start = time.perf_counter()
+    wanted = set(columns)
+    for n, candidate in enumerate((encoding,) if encoding else CSV_ENCODINGS):
+        try:
+            df = pd.read_csv(
+                io.BytesIO(source) if isinstance(source, bytes) else source,
+                usecols=lambda c: c in wanted,
+                dtype={NAME_COL: str},
+                encoding=candidate,
+            )
+            break
+        except UnicodeDecodeError:
+            if encoding or n == len(CSV_ENCODINGS) - 1:
+                raise
+    df = normalize_line_columns(df)
+    return df, _stats(df, start)
+
+
+TABULAR_READERS = {
+    "excel": read_excel_lines,
+    "csv": read_csv_lines,
+    "parquet": read_parquet_lines,
+}
@@ -0,0 +1,234 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from po_create import build_po_vals, create_large_purchase_order, create_purchase_orders
+from product_catalog import CATALOG_DIR
+from rfq import CONFIRM_BATCH_SIZE, confirm_rfqs_batched
+from tracing import bind_context
+
+# ========= BACKGROUND JOBS =========
+# PO creation and RFQ confirmation run on a small thread pool instead of the
+# Streamlit script thread. Each job is a row in a SQLite table. submit()
+# returns its ID right away and the log tab polls the row. The caller supplies
+# an idempotency key: submitting the same key again returns the existing job,
+# so a rerun or a double click never creates a PO twice. A failed, partial or
+# interrupted job can be retried under the same key: the retry gets the
+# previous result, so POs and RFQs that already went through are not sent
+# again, and a large PO resumes from its checkpoint. A retry must carry the
+# same summary (mode, groups, merge rule, ...); different work under an old
+# key is refused rather than run against that job's partial result.
+#
+# Only a JSON summary of each job is persisted. Lines and the Odoo connection
+# (API key included) stay in memory, so jobs that were queued or running when
+# the server stopped are marked "interrupted" on startup, not replayed.
+
+JOB_DB = os.environ.get("SWAG_JOB_DB", os.path.join(CATALOG_DIR, "jobs.sqlite3"))
+JOB_WORKERS = int(os.environ.get("SWAG_JOB_WORKERS", "2"))
+RETRYABLE = ("error", "partial", "interrupted")
+FINISHED = ("done",) + RETRYABLE
+
+
+def _loads(value):
+    return None if value is None else json.loads(value)
+
+
+class JobRunner:
+    def __init__(self, path=JOB_DB, handlers=None, max_workers=JOB_WORKERS):
+        self.path = path
+        self.handlers = handlers if handlers is not None else JOB_HANDLERS
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="swag-job")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    idem_key TEXT UNIQUE NOT NULL,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    summary TEXT,
+                    progress TEXT,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL,
+                    started_at REAL,
+                    finished_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_created_at ON jobs(created_at);
+                """
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'interrupted', error = 'server restarted', "
+                "finished_at = ? WHERE status IN ('queued', 'running')",
+                (time.time(),),
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def submit(self, kind, idem_key, summary, runtime):
+        # Returns (job_id, started): started is False when the key already
+        # belongs to a queued, running or finished job, or to a failed job
+        # whose summary differs from this one.
+        if kind not in self.handlers:
+            raise ValueError(f"unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        summary_json = json.dumps(summary, default=str)
+        with self._connect() as conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, idem_key, kind, status, summary, created_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, idem_key, kind, summary_json, time.time()),
+            ).rowcount
+            if not inserted:
+                job_id, status, stored_summary, previous = conn.execute(
+                    "SELECT id, status, summary, result FROM jobs WHERE idem_key = ?", (idem_key,)
+                ).fetchone()
+                if status not in RETRYABLE or stored_summary != summary_json:
+                    return job_id, False
+                # Only one caller wins the retry.
+                retried = conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = NULL, finished_at = NULL "
+                    f"WHERE id = ? AND status IN ({', '.join('?' * len(RETRYABLE))})",
+                    (job_id, *RETRYABLE),
+                ).rowcount
+                if not retried:
+                    return job_id, False
+                runtime = {**runtime, "previous": _loads(previous)}
+        # The job's Odoo calls are traced into the submitting rerun.
+        self._pool.submit(bind_context(self._run), job_id, kind, runtime)
+        return job_id, True
+
+    def _update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _run(self, job_id, kind, runtime):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, progress = NULL, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (time.time(), job_id),
+            )
+
+        def report(progress):
+            self._update(job_id, progress=json.dumps(progress, default=str))
+
+        try:
+            result = self.handlers[kind](runtime, report)
+        except Exception as e:
+            self._update(job_id, status="error", error=str(e), finished_at=time.time())
+            return
+        status = "partial" if result.get("failed") else "done"
+        self._update(
+            job_id, status=status, result=json.dumps(result, default=str),
+            finished_at=time.time(),
+        )
+
+    def get(self, job_id):
+        jobs = self.find([job_id])
+        return jobs[0] if jobs else None
+
+    def find(self, job_ids):
+        if not job_ids:
+            return []
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE id IN ({', '.join('?' * len(job_ids))}) "
+                "ORDER BY created_at DESC",
+                list(job_ids),
+            ).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            for key in ("summary", "progress", "result"):
+                job[key] = _loads(job[key])
+            jobs.append(job)
+        return jobs
+
+
+# ========= JOB HANDLERS =========
+# runtime carries the in-memory inputs: "conn" is (db, uid, password, models)
+# as returned by get_odoo_connection, plus the kind-specific arguments. On a
+# retry, "previous" is the stored result of the last attempt (None if it
+# raised or was interrupted).
+
+def run_po_create_job(runtime, report):
+    db, uid, password, models = runtime["conn"]
+    ctx = runtime.get("ctx")
+    mode = runtime["mode"]
+    if mode == "split":
+        previous = (runtime.get("previous") or {}).get("pos") or []
+        created = [r for r in previous if r["po_id"] and not r["error"]]
+        created_keys = {(r["vendor_id"], r["picking_type_id"], r["distribution_id"]) for r in created}
+        groups = {k: v for k, v in runtime["groups"].items() if k not in created_keys}
+        results, seconds = create_purchase_orders(
+            models, db, uid, password, groups, runtime["company_id"], ctx,
+            checkpoints=runtime.get("checkpoints"),
+        )
+        failed = sum(1 for r in results if r["error"])
+        order = {key: n for n, key in enumerate(runtime["groups"])}
+        results = sorted(
+            created + results,
+            key=lambda r: order.get((r["vendor_id"], r["picking_type_id"], r["distribution_id"]), -1),
+        )
+        return {"mode": mode, "pos": results, "seconds": round(seconds, 3), "failed": failed}
+
+    po_vals = build_po_vals(
+        runtime["vendor_id"], runtime["picking_type_id"], runtime["company_id"], []
+    )
+    start = time.perf_counter()
+    if mode == "large":
+        checkpoint = runtime["checkpoint"]
+        create_large_purchase_order(
+            models, db, uid, password, po_vals, runtime["lines"], checkpoint, ctx,
+            on_progress=lambda cp: report(
+                {"done": cp["lines_done"], "total": cp["lines_total"],
+                 "lines_per_sec": round(cp["lines_per_sec"] or 0)}
+            ),
+        )
+        po_id = checkpoint["po_id"]
+    else:
+        po_vals["order_line"] = [(0, 0, line) for line in runtime["lines"]]
+        po_id = models.execute_kw(
+            db, uid, password,
+            "purchase.order", "create",
+            [po_vals],
+            {"context": ctx or {}},
+        )
+    return {
+        "mode": mode,
+        "pos": [{"po_id": po_id, "lines": len(runtime["lines"]), "error": None}],
+        "seconds": round(time.perf_counter() - start, 3),
+        "failed": 0,
+    }
+
+
+def run_rfq_confirm_job(runtime, report):
+    db, uid, password, models = runtime["conn"]
+    previous = (runtime.get("previous") or {}).get("results") or []
+    confirmed = [r for r in previous if r["status"] == "confirmed"]
+    confirmed_ids = {r["id"] for r in confirmed}
+    results, seconds = confirm_rfqs_batched(
+        models, db, uid, password,
+        [i for i in runtime["rfq_ids"] if i not in confirmed_ids], runtime.get("ctx"),
+        batch_size=runtime.get("batch_size", CONFIRM_BATCH_SIZE),
+        on_progress=lambda done, total, _batch: report({"done": done, "total": total}),
+    )
+    failed = sum(1 for r in results if r["status"] == "error")
+    order = {rfq_id: n for n, rfq_id in enumerate(runtime["rfq_ids"])}
+    results = sorted(confirmed + results, key=lambda r: order.get(r["id"], -1))
+    return {"results": results, "seconds": round(seconds, 3), "failed": failed}
+
+
+JOB_HANDLERS = {
+    "po_create": run_po_create_job,
+    "rfq_confirm": run_rfq_confirm_job,
+}
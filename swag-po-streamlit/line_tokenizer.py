@@ -0,0 +1,37 @@
+import re
+
+# ========= SWAG INVOICE LINE TOKENIZER =========
+# One pass per line with precompiled patterns:
+#   - price: last "SR <amount>" on the line
+#   - qty:   first integer after that amount
+#   - model: last alphanumeric token that contains a letter
+# The qty is located by position after the price match, so prices are never
+# interpolated into a regex (a "." in "12.50" used to match any character).
+
+PRICE_RE = re.compile(r"SR\s*([\d,]+\.?\d*)")
+QTY_AFTER_PRICE_RE = re.compile(r"[^\d]+(\d+)")
+MODEL_TOKEN_RE = re.compile(r"[A-Za-z0-9\-]*[A-Za-z][A-Za-z0-9\-]*")
+
+
+def tokenize_line(line: str):
+    if "SR" not in line:
+        return None
+
+    price_match = None
+    for price_match in PRICE_RE.finditer(line):
+        pass
+    if price_match is None:
+        return None
+    try:
+        price = float(price_match.group(1).replace(",", ""))
+    except ValueError:
+        return None
+
+    qty_match = QTY_AFTER_PRICE_RE.match(line, price_match.end())
+    if not qty_match:
+        return None
+    qty = float(qty_match.group(1))
+
+    model_tokens = MODEL_TOKEN_RE.findall(line)
+    model = model_tokens[-1] if model_tokens else line.strip()
+    return model, qty, price
@@ -0,0 +1,181 @@
+import http.client
+import queue
+import random
+import threading
+import time
+import xmlrpc.client
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from tracing import active_trace, bind_context
+
+# ========= POOLED ODOO XML-RPC CLIENT =========
+# xmlrpc.client.ServerProxy is not thread-safe, so one shared proxy cannot
+# serve every Streamlit session. OdooClient keeps a small pool of proxies,
+# each with its own keep-alive HTTP(S) connection and socket timeout, hands
+# one to each call, and retries read-only methods with backoff on transport
+# errors. execute_kw() has the same signature as ServerProxy.execute_kw.
+
+READ_METHODS = {
+    "search",
+    "search_read",
+    "search_count",
+    "read",
+    "read_group",
+    "name_search",
+    "fields_get",
+}
+TRANSPORT_ERRORS = (OSError, http.client.HTTPException, xmlrpc.client.ProtocolError)
+
+# Body sizes of the last request / response on this thread, for tracing.
+_wire = threading.local()
+
+
+class _TimeoutTransportMixin:
+    def __init__(self, *args, timeout=60, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        # Transport reuses self._connection between requests (HTTP keep-alive).
+        conn = super().make_connection(host)
+        conn.timeout = self.timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(self.timeout)
+        return conn
+
+    def send_content(self, connection, request_body):
+        _wire.request_bytes = len(request_body)
+        super().send_content(connection, request_body)
+
+    def parse_response(self, response):
+        _wire.response_bytes = int(response.getheader("Content-Length") or 0)
+        return super().parse_response(response)
+
+
+class KeepAliveTransport(_TimeoutTransportMixin, xmlrpc.client.Transport):
+    pass
+
+
+class KeepAliveSafeTransport(_TimeoutTransportMixin, xmlrpc.client.SafeTransport):
+    pass
+
+
+def _make_proxy(endpoint, timeout):
+    transport_cls = KeepAliveSafeTransport if endpoint.startswith("https") else KeepAliveTransport
+    return xmlrpc.client.ServerProxy(
+        endpoint, transport=transport_cls(timeout=timeout), allow_none=True
+    )
+
+
+class OdooClient:
+    def __init__(self, url, pool_size=4, timeout=60, retries=3, backoff=0.5):
+        self.url = url.rstrip("/")
+        self.endpoint = f"{self.url}/xmlrpc/2/object"
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def authenticate(self, db, username, api_key):
+        common = _make_proxy(f"{self.url}/xmlrpc/2/common", self.timeout)
+        try:
+            return common.authenticate(db, username, api_key, {})
+        finally:
+            common("close")()
+
+    @contextmanager
+    def _proxy(self):
+        # At most pool_size calls are in flight; extra callers wait for a slot.
+        self._slots.acquire()
+        try:
+            try:
+                proxy = self._idle.get_nowait()
+            except queue.Empty:
+                proxy = _make_proxy(self.endpoint, self.timeout)
+            try:
+                yield proxy
+            except TRANSPORT_ERRORS:
+                # Connection state is unknown after a transport error: drop it.
+                proxy("close")()
+                raise
+            except BaseException:
+                # e.g. an Odoo Fault: the response was read, the proxy is fine.
+                self._idle.put(proxy)
+                raise
+            else:
+                self._idle.put(proxy)
+        finally:
+            self._slots.release()
+
+    def execute_kw(self, db, uid, password, model, method, args, kwargs=None):
+        trace = active_trace()
+        if trace is None:
+            return self._execute_kw(db, uid, password, model, method, args, kwargs)
+        _wire.request_bytes = _wire.response_bytes = 0
+        start = time.perf_counter()
+        error = None
+        try:
+            return self._execute_kw(db, uid, password, model, method, args, kwargs)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            trace.add(
+                "odoo", f"{model}.{method}", time.perf_counter() - start,
+                request_bytes=_wire.request_bytes, response_bytes=_wire.response_bytes,
+                error=error,
+            )
+
+    def _execute_kw(self, db, uid, password, model, method, args, kwargs=None):
+        attempts = self.retries + 1 if method in READ_METHODS else 1
+        for attempt in range(attempts):
+            try:
+                with self._proxy() as proxy:
+                    return proxy.execute_kw(db, uid, password, model, method, args, kwargs or {})
+            except TRANSPORT_ERRORS:
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt) * (1 + random.random() * 0.25))
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait()("close")()
+            except queue.Empty:
+                return
+
+
+# ========= CONCURRENT READS =========
+def run_concurrently(calls, max_workers=None):
+    # calls: {name: (fn, *args)}. Independent reads are dispatched together,
+    # so wall time approaches the slowest call instead of the sum. Returns
+    # ({name: result}, {name: seconds}); the first failure is re-raised once
+    # every call has finished.
+    results, timings, errors = {}, {}, []
+
+    def timed(name, fn, args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            timings[name] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers or len(calls) or 1) as pool:
+        futures = {
+            name: pool.submit(bind_context(timed), name, call[0], call[1:])
+            for name, call in calls.items()
+        }
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                errors.append(e)
+    timings["total"] = time.perf_counter() - start
+
+    if errors:
+        raise errors[0]
+    return results, timings
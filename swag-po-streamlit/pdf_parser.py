@@ -0,0 +1,134 @@
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from line_tokenizer import tokenize_line
+
+# ========= SWAG PDF PARSER =========
+# Pages are extracted and parsed one at a time, so memory stays flat with
+# document size. With workers > 1 pages are fanned out to a process pool in
+# contiguous chunks and merged back in page order. pdfplumber is imported on
+# first use, so importing this module for its column names stays cheap.
+
+NAME_COL = "order_line/name"
+QTY_COL = "order_line/product_uom_qty"
+PRICE_COL = "order_line/price_unit"
+LINE_COLUMNS = [NAME_COL, QTY_COL, PRICE_COL]
+
+PDF_WORKERS = int(os.environ.get("SWAG_PDF_WORKERS", "0"))
+MIN_PAGES_PER_WORKER = 4
+
+AMOUNT_RE = re.compile(r"SR\s*([\d,]+\.?\d*)")
+HEAD_AMOUNT_RE = re.compile(r"\s*([\d,]+\.?\d*)")
+DANGLING_SR_RE = re.compile(r"SR\s*\Z")
+
+
+def page_amount_info(text: str):
+    # Everything needed to find the last "SR <amount>" of the whole document
+    # without keeping the full text: the page's own last amount, a leading
+    # amount that may complete an "SR" left dangling at the end of the
+    # previous page, and whether this page itself ends on a dangling "SR"
+    # (None for a blank page, which leaves the previous state untouched).
+    amounts = AMOUNT_RE.findall(text + "\n")
+    last_amount = amounts[-1] if amounts else None
+    head = HEAD_AMOUNT_RE.match(text)
+    head_amount = head.group(1) if head else None
+    if text.strip():
+        dangling = DANGLING_SR_RE.search(text) is not None
+    else:
+        dangling = None
+    return head_amount, last_amount, dangling
+
+
+def parse_page(text: str):
+    rows = []
+    for line in text.splitlines():
+        parsed = tokenize_line(line)
+        if parsed is not None:
+            rows.append(parsed)
+    return rows, page_amount_info(text)
+
+
+def iter_page_texts(file_bytes: bytes, page_numbers=None):
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        pages = pdf.pages if page_numbers is None else [pdf.pages[i] for i in page_numbers]
+        for page in pages:
+            text = page.extract_text() or ""
+            page.flush_cache()
+            yield text
+
+
+def iter_parsed_pages(file_bytes: bytes, page_numbers=None):
+    for text in iter_page_texts(file_bytes, page_numbers):
+        yield parse_page(text)
+
+
+def _parse_page_chunk(args):
+    file_bytes, page_numbers = args
+    return list(iter_parsed_pages(file_bytes, page_numbers))
+
+
+def iter_parsed_pages_parallel(file_bytes: bytes, workers: int):
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        page_count = len(pdf.pages)
+
+    n_chunks = max(1, min(workers, page_count // MIN_PAGES_PER_WORKER))
+    if n_chunks == 1:
+        yield from iter_parsed_pages(file_bytes)
+        return
+
+    size = -(-page_count // n_chunks)
+    chunks = [
+        (file_bytes, list(range(start, min(start + size, page_count))))
+        for start in range(0, page_count, size)
+    ]
+    with ProcessPoolExecutor(max_workers=n_chunks) as pool:
+        # map() yields chunk results in submission order, i.e. page order.
+        for chunk_result in pool.map(_parse_page_chunk, chunks):
+            yield from chunk_result
+
+
+def merge_total(amount_infos):
+    total_str = None
+    dangling = False
+    for head_amount, last_amount, page_dangling in amount_infos:
+        if dangling and head_amount is not None:
+            total_str = head_amount
+        if last_amount is not None:
+            total_str = last_amount
+        if page_dangling is not None:
+            dangling = page_dangling
+    if total_str is None:
+        return None
+    try:
+        return float(total_str.replace(",", ""))
+    except Exception:
+        return None
+
+
+def parse_swag_pdf(file_bytes: bytes, workers=None):
+    workers = PDF_WORKERS if workers is None else workers
+    if workers and workers > 1:
+        pages = iter_parsed_pages_parallel(file_bytes, workers)
+    else:
+        pages = iter_parsed_pages(file_bytes)
+
+    names, qtys, prices, amount_infos = [], [], [], []
+    for rows, amount_info in pages:
+        for model, qty, price in rows:
+            names.append(model)
+            qtys.append(qty)
+            prices.append(price)
+        amount_infos.append(amount_info)
+
+    pdf_total = merge_total(amount_infos)
+    if not names:
+        return pd.DataFrame(columns=LINE_COLUMNS), pdf_total
+    return pd.DataFrame({NAME_COL: names, QTY_COL: qtys, PRICE_COL: prices}), pdf_total
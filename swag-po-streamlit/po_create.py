@@ -0,0 +1,241 @@
+import hashlib
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from odoo_client import run_concurrently
+
+# ========= MULTI-PO CREATION =========
+# A consolidated supplier file can span several vendors, receipt operation
+# types and analytic distributions. Rows are grouped by those keys, one
+# purchase.order vals dict is built per group and all of them are created
+# with a single create() call on a list of vals (or, for very large uploads,
+# a few chunked create() calls running in parallel). A group that alone is
+# larger than LARGE_PO_THRESHOLD lines goes through the chunked, resumable
+# large-PO path below, with its own checkpoint.
+
+VENDOR_COL = "partner_id"
+PICKING_COL = "picking_type_id"
+MULTI_PO_CHUNK_LINES = 2000
+MULTI_PO_WORKERS = 4
+
+
+def _id_column(df, col, positions, default):
+    if col not in df.columns:
+        return [default] * len(positions)
+    values = pd.to_numeric(df[col].iloc[positions], errors="coerce").to_numpy()
+    return [int(v) if v == v else default for v in values.tolist()]
+
+
+def header_keys(df: pd.DataFrame, row_positions, vendor_id, picking_type_id):
+    # (vendor, picking type) per line; file columns win, sidebar is the fallback.
+    positions = np.asarray(row_positions, dtype=np.intp)
+    vendors = _id_column(df, VENDOR_COL, positions, vendor_id)
+    pickings = _id_column(df, PICKING_COL, positions, picking_type_id)
+    return list(zip(vendors, pickings))
+
+
+def group_purchase_orders(lines, keys):
+    groups = {}
+    for line, (vendor_id, picking_type_id) in zip(lines, keys):
+        key = (vendor_id, picking_type_id, line.get("analytic_distribution_id"))
+        groups.setdefault(key, []).append(line)
+    return groups
+
+
+def build_po_vals(vendor_id, picking_type_id, company_id, lines, date_order=None):
+    return {
+        "partner_id": int(vendor_id),
+        "date_order": date_order or time.strftime("%Y-%m-%d"),
+        "company_id": company_id,
+        "picking_type_id": picking_type_id,
+        "order_line": [(0, 0, line) for line in lines],
+    }
+
+
+def _chunk_by_lines(items, max_lines):
+    chunk, size = [], 0
+    for item in items:
+        n = len(item[1]["order_line"])
+        if chunk and size + n > max_lines:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(item)
+        size += n
+    if chunk:
+        yield chunk
+
+
+def _create_many(models, db, uid, password, vals_list, ctx):
+    # Errors are returned, not raised, so one failing chunk does not hide the
+    # IDs of chunks that were created next to it.
+    start = time.perf_counter()
+    try:
+        ids = models.execute_kw(
+            db, uid, password,
+            "purchase.order", "create",
+            [vals_list],
+            {"context": ctx or {}},
+        )
+        error = None
+    except Exception as e:
+        ids, error = [None] * len(vals_list), str(e)
+    return ids, time.perf_counter() - start, error
+
+
+def _create_large(models, db, uid, password, po_vals, lines, checkpoint, ctx):
+    start = time.perf_counter()
+    try:
+        create_large_purchase_order(models, db, uid, password, po_vals, lines, checkpoint, ctx)
+        error = None
+    except Exception as e:
+        error = str(e)
+    return checkpoint["po_id"], time.perf_counter() - start, error
+
+
+def create_purchase_orders(models, db, uid, password, groups, company_id, ctx=None,
+                           chunk_lines=MULTI_PO_CHUNK_LINES, max_workers=MULTI_PO_WORKERS,
+                           checkpoints=None, large_threshold=None):
+    # Returns one result row per PO: keys, line count, Odoo ID and the wall
+    # time of the call(s) that wrote it. checkpoints maps group key to the
+    # large-PO checkpoint of that group; pass the same dict again to resume.
+    large_threshold = LARGE_PO_THRESHOLD if large_threshold is None else large_threshold
+    checkpoints = {} if checkpoints is None else checkpoints
+    items, large = [], []
+    for key, lines in groups.items():
+        if len(lines) <= large_threshold:
+            items.append((key, build_po_vals(key[0], key[1], company_id, lines)))
+            continue
+        po_vals = build_po_vals(key[0], key[1], company_id, [])
+        checkpoint = checkpoints[key] = resume_checkpoint(checkpoints.get(key), po_vals, lines)
+        large.append((key, po_vals, lines, checkpoint))
+
+    chunks = list(_chunk_by_lines(items, chunk_lines))
+    calls = {
+        ("chunk", i): (_create_many, models, db, uid, password, [vals for _, vals in chunk], ctx)
+        for i, chunk in enumerate(chunks)
+    }
+    for n, (key, po_vals, lines, checkpoint) in enumerate(large):
+        calls[("large", n)] = (
+            _create_large, models, db, uid, password, po_vals, lines, checkpoint, ctx
+        )
+    created, timings = run_concurrently(calls, max_workers=max_workers)
+
+    results = []
+    for n, (key, po_vals, lines, checkpoint) in enumerate(large):
+        po_id, seconds, error = created[("large", n)]
+        results.append(
+            {
+                "po_id": po_id,
+                "vendor_id": key[0],
+                "picking_type_id": key[1],
+                "distribution_id": key[2],
+                "lines": len(lines),
+                "seconds": round(seconds, 3),
+                "error": error,
+            }
+        )
+    for i, chunk in enumerate(chunks):
+        ids, seconds, error = created[("chunk", i)]
+        for (key, vals), po_id in zip(chunk, ids):
+            results.append(
+                {
+                    "po_id": po_id,
+                    "vendor_id": key[0],
+                    "picking_type_id": key[1],
+                    "distribution_id": key[2],
+                    "lines": len(vals["order_line"]),
+                    "seconds": round(seconds, 3),
+                    "error": error,
+                }
+            )
+    order = {key: n for n, key in enumerate(groups)}
+    results.sort(key=lambda r: order[(r["vendor_id"], r["picking_type_id"], r["distribution_id"])])
+    return results, timings["total"]
+
+
+# ========= LARGE PO: CHUNKED, RESUMABLE =========
+# Thousands of inline (0, 0, line) tuples make one huge XML-RPC body that
+# times out on Odoo SaaS. Large orders are created header-first and lines
+# are appended with write() in fixed-size chunks. Progress is kept in a
+# plain checkpoint dict (stored in session state by the app), so a failed run
+# resumes after the last committed chunk instead of starting over.
+
+LARGE_PO_THRESHOLD = 1000
+LARGE_PO_CHUNK_SIZE = 250
+
+
+def po_fingerprint(po_vals, lines):
+    # date_order is left out so a retry later in the day still resumes.
+    header = {k: v for k, v in po_vals.items() if k not in ("date_order", "order_line")}
+    payload = json.dumps([header, list(lines)], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def new_checkpoint(po_vals, lines):
+    return {
+        "fingerprint": po_fingerprint(po_vals, lines),
+        "po_id": None,
+        "lines_done": 0,
+        "lines_total": len(lines),
+        "lines_per_sec": None,
+        "error": None,
+    }
+
+
+def resume_checkpoint(checkpoint, po_vals, lines):
+    # A checkpoint is only reused for the same lines and while it has lines
+    # left to write; a finished one would hand back an old PO ID.
+    if (
+        not checkpoint
+        or checkpoint["fingerprint"] != po_fingerprint(po_vals, lines)
+        or (checkpoint["po_id"] and checkpoint["lines_done"] >= checkpoint["lines_total"])
+    ):
+        return new_checkpoint(po_vals, lines)
+    return checkpoint
+
+
+def create_large_purchase_order(models, db, uid, password, po_vals, lines, checkpoint,
+                                ctx=None, chunk_size=LARGE_PO_CHUNK_SIZE, on_progress=None):
+    ctx = ctx or {}
+    checkpoint["error"] = None
+    if checkpoint["po_id"] is None:
+        checkpoint["po_id"] = models.execute_kw(
+            db, uid, password,
+            "purchase.order", "create",
+            [{**po_vals, "order_line": []}],
+            {"context": ctx},
+        )
+    else:
+        # The last write may have landed even though its response was lost;
+        # trust Odoo's line count over the local checkpoint.
+        checkpoint["lines_done"] = models.execute_kw(
+            db, uid, password,
+            "purchase.order.line", "search_count",
+            [[["order_id", "=", checkpoint["po_id"]]]],
+            {"context": ctx},
+        )
+
+    start = time.perf_counter()
+    written = 0
+    while checkpoint["lines_done"] < len(lines):
+        done = checkpoint["lines_done"]
+        chunk = lines[done:done + chunk_size]
+        try:
+            models.execute_kw(
+                db, uid, password,
+                "purchase.order", "write",
+                [[checkpoint["po_id"]], {"order_line": [(0, 0, line) for line in chunk]}],
+                {"context": ctx},
+            )
+        except Exception as e:
+            checkpoint["error"] = str(e)
+            raise
+        checkpoint["lines_done"] = done + len(chunk)
+        written += len(chunk)
+        checkpoint["lines_per_sec"] = written / max(time.perf_counter() - start, 1e-9)
+        if on_progress is not None:
+            on_progress(checkpoint)
+    return checkpoint
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from session_store import LineStore
+
+# ========= DUPLICATE LINE AGGREGATION =========
+# Supplier files often repeat a model on several rows. Before anything is sent
+# to Odoo, matched lines can be merged with one group-by over the columnar
+# LineStore. Lines are only merged within the same product, analytic
+# distribution, vendor and operation type, so PO grouping is unchanged.
+
+# Odoo stores price_unit at the "Product Price" decimal precision (2 digits
+# unless changed in Settings > Technical > Decimal Accuracy).
+PRICE_DIGITS = int(os.environ.get("SWAG_PRICE_DIGITS", "2"))
+
+MERGE_RULES = {
+    "none": "Keep every line",
+    "sum_same_price": "Sum qty of identical model + price",
+    "weighted_price": "Sum qty per model, weighted-average price",
+}
+
+
+def round_price(values, digits=PRICE_DIGITS):
+    # Half-up like Odoo's float_round; the nudge keeps 1.005 (really
+    # 1.00499...) rounding to 1.01 as it does in Odoo.
+    values = np.asarray(values, dtype=np.float64)
+    return np.round(values + np.sign(values) * 1e-9, digits)
+
+
+def aggregate_lines(store: LineStore, rule="none"):
+    # Returns (LineStore, number of lines merged away).
+    if rule == "none" or len(store) == 0:
+        return store, 0
+    if rule not in MERGE_RULES:
+        raise ValueError(f"unknown merge rule: {rule}")
+
+    frame = pd.DataFrame(
+        {
+            "name": store.names,
+            "product": store.product_ids,
+            "dist": store.distribution_ids,
+            "vendor": store.vendor_ids,
+            "picking": store.picking_ids,
+            "qty": store.qty,
+            "price": store.price,
+            "amount": store.qty * store.price,
+        }
+    )
+    keys = ["name", "product", "dist", "vendor", "picking"]
+    aggs = {"qty": ("qty", "sum"), "amount": ("amount", "sum")}
+    if rule == "sum_same_price":
+        keys.append("price")
+    else:
+        aggs["price"] = ("price", "first")
+    out = frame.groupby(keys, sort=False, observed=True).agg(**aggs).reset_index()
+
+    qty = out["qty"].to_numpy(dtype=np.float64)
+    price = out["price"].to_numpy(dtype=np.float64)
+    if rule == "weighted_price":
+        # Zero total qty has no weighted price; keep the first one seen.
+        nonzero = qty != 0
+        price = np.where(nonzero, out["amount"].to_numpy() / np.where(nonzero, qty, 1), price)
+        # Send the price Odoo will store, so the duplicate check sees it too.
+        price = round_price(price)
+
+    merged = LineStore(
+        pd.Categorical(out["name"]),
+        qty,
+        price,
+        out["product"].to_numpy(dtype=np.int64),
+        out["dist"].to_numpy(dtype=np.int64),
+        out["vendor"].to_numpy(dtype=np.int64),
+        out["picking"].to_numpy(dtype=np.int64),
+    )
+    return merged, len(store) - len(merged)
+
+
+# ========= RECENT PO DUPLICATE CHECK =========
+# A PO's line set is hashed as a sorted list of (product, qty, price), the
+# price rounded to PRICE_DIGITS on both sides so a 1.8333 line in the file
+# matches the 1.83 Odoo stored. Before creating, the hashes of the vendors'
+# recent POs are computed from two search_read calls and compared, so a file
+# that was already submitted (from another session, or a day earlier) is
+# caught before it is created again.
+
+DUPLICATE_LOOKBACK_DAYS = int(os.environ.get("SWAG_DUPLICATE_LOOKBACK_DAYS", "7"))
+RECENT_PO_LIMIT = int(os.environ.get("SWAG_RECENT_PO_LIMIT", "200"))
+
+
+def _m2o_id(value):
+    return value[0] if isinstance(value, (list, tuple)) and value else value or 0
+
+
+def line_set_hash(lines):
+    items = sorted(
+        (int(_m2o_id(line.get("product_id"))), round(float(line["product_qty"]), 4),
+         float(round_price(line["price_unit"])))
+        for line in lines
+    )
+    return hashlib.sha1(json.dumps(items).encode("utf-8")).hexdigest()
+
+
+def find_duplicate_pos(models, db, uid, password, groups, ctx=None,
+                       days=DUPLICATE_LOOKBACK_DAYS, limit=RECENT_PO_LIMIT):
+    # groups: {(vendor_id, picking_type_id, distribution_id): [line dicts]}.
+    # Returns {group key: [names of recent POs with the same line set]}.
+    vendors = sorted({key[0] for key in groups if key[0]})
+    if not vendors:
+        return {}
+    since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+    orders = models.execute_kw(
+        db, uid, password,
+        "purchase.order", "search_read",
+        [[["partner_id", "in", vendors], ["create_date", ">=", since], ["state", "!=", "cancel"]]],
+        {"fields": ["name", "partner_id"], "limit": limit, "order": "create_date desc",
+         "context": ctx or {}},
+    )
+    if not orders:
+        return {}
+    order_lines = models.execute_kw(
+        db, uid, password,
+        "purchase.order.line", "search_read",
+        [[["order_id", "in", [o["id"] for o in orders]], ["product_id", "!=", False]]],
+        {"fields": ["order_id", "product_id", "product_qty", "price_unit"],
+         "context": ctx or {}},
+    )
+    by_order = {}
+    for line in order_lines:
+        by_order.setdefault(_m2o_id(line["order_id"]), []).append(line)
+
+    recent = {}  # (vendor_id, hash) -> [PO names]
+    for order in orders:
+        lines = by_order.get(order["id"])
+        if lines:
+            key = (_m2o_id(order["partner_id"]), line_set_hash(lines))
+            recent.setdefault(key, []).append(order["name"])
+
+    duplicates = {}
+    for key, lines in groups.items():
+        names = recent.get((key[0], line_set_hash(lines)))
+        if names:
+            duplicates[key] = names
+    return duplicates
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from pdf_parser import NAME_COL, PRICE_COL, QTY_COL
+
+# ========= PO LINE BUILDER =========
+# Selected rows are taken with one positional indexer, NaN qty / price rows
+# are dropped with a vectorized mask and the Odoo order_line payload is built
+# column-wise. Log lines are only rendered when they are displayed.
+
+DIST_COL = "order_line/analytic_distribution_id"
+
+
+class LineLog:
+    # Behaves like the old list of log strings (len, slicing, iteration) but
+    # formats a message only when it is actually read.
+
+    def __init__(self, row_positions, names, product_ids=None):
+        self.row_positions = row_positions
+        self.names = names
+        # Filled by product resolution; None entries are missing products.
+        self.product_ids = product_ids
+
+    def _render(self, i):
+        row = self.row_positions[i] + 2
+        if self.product_ids is None:
+            return f"✅ Row {row}: {self.names[i]} → added (selected line, without product_id)"
+        if self.product_ids[i] is None:
+            return f"❌ Row {row}: {self.names[i]} → product not found in Odoo"
+        return f"✅ Row {row}: {self.names[i]} → product_id {self.product_ids[i]}"
+
+    def __len__(self):
+        return len(self.names)
+
+    def tail(self, n):
+        # Ring-buffer view for session state: only the newest n entries.
+        start = max(0, len(self) - n)
+        product_ids = None if self.product_ids is None else self.product_ids[start:]
+        return LineLog(self.row_positions[start:], self.names[start:], product_ids)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._render(i) for i in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(key)
+        return self._render(key)
+
+    def __iter__(self):
+        return (self._render(i) for i in range(len(self)))
+
+
+def build_order_lines(df: pd.DataFrame, selected_rows, distribution_id=None):
+    positions = np.asarray(selected_rows if selected_rows is not None else [], dtype=np.intp)
+    sel = df.iloc[positions]
+
+    qty = sel[QTY_COL].to_numpy(dtype="float64", na_value=np.nan)
+    price = sel[PRICE_COL].to_numpy(dtype="float64", na_value=np.nan)
+    keep = ~(np.isnan(qty) | np.isnan(price))
+
+    names = sel[NAME_COL].astype(str).to_numpy()[keep].tolist()
+    qty = qty[keep].tolist()
+    price = price[keep].tolist()
+
+    lines = [
+        {"name": n, "product_qty": q, "price_unit": p}
+        for n, q, p in zip(names, qty, price)
+    ]
+
+    # Per-row distribution from the file wins; the sidebar choice is the fallback.
+    if DIST_COL in sel.columns:
+        dists = pd.to_numeric(sel[DIST_COL], errors="coerce").to_numpy()[keep]
+        for line, dist in zip(lines, dists.tolist()):
+            if dist == dist:  # not NaN
+                line["analytic_distribution_id"] = int(dist)
+            elif distribution_id:
+                line["analytic_distribution_id"] = distribution_id
+    elif distribution_id:
+        for line in lines:
+            line["analytic_distribution_id"] = distribution_id
+
+    return lines, LineLog(positions[keep], names)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from pdf_parser import NAME_COL
+
+# ========= WINDOWED PREVIEW =========
+# Large uploads are never handed to st.dataframe whole: search, sort and
+# paging run here on the server and only the visible window is sent to the
+# browser. The returned positions map window-local selections back to global
+# row positions of the uploaded file.
+
+PREVIEW_PAGE_ROWS = 200
+
+
+def preview_positions(df: pd.DataFrame, search="", sort_col=None, ascending=True):
+    positions = np.arange(len(df))
+    if search and NAME_COL in df.columns:
+        mask = df[NAME_COL].astype(str).str.contains(search, case=False, regex=False)
+        positions = positions[mask.to_numpy()]
+    if sort_col and sort_col in df.columns and len(positions):
+        keys = df[sort_col].iloc[positions]
+        order = np.argsort(keys.to_numpy(), kind="stable") if keys.dtype.kind in "fiub" \
+            else keys.astype(str).argsort(kind="stable").to_numpy()
+        if not ascending:
+            order = order[::-1]
+        positions = positions[order]
+    return positions
+
+
+def preview_window(df: pd.DataFrame, positions, page=0, page_rows=PREVIEW_PAGE_ROWS):
+    window = positions[page * page_rows:(page + 1) * page_rows]
+    return df.iloc[window], window
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+
+from product_resolver import PRODUCT_FIELDS, ProductIndex
+
+# ========= LOCAL PRODUCT CATALOG =========
+# SQLite copy of product.product keyed by default_code, barcode and
+# normalized name. sync() pulls only records with write_date > last sync, so
+# after the first run matching at upload time is purely local.
+
+CATALOG_DIR = os.environ.get("SWAG_CATALOG_DIR", ".swag_cache")
+SYNC_PAGE_SIZE = 2000
+LOOKUP_CHUNK_SIZE = 500
+
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_name(value):
+    return _SPACES_RE.sub(" ", str(value)).strip().casefold()
+
+
+def catalog_path(url, db):
+    key = hashlib.sha1(f"{url}|{db}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CATALOG_DIR, f"products-{key}.sqlite3")
+
+
+class ProductCatalog:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS products (
+                    id INTEGER PRIMARY KEY,
+                    default_code TEXT,
+                    barcode TEXT,
+                    name TEXT,
+                    norm_name TEXT,
+                    write_date TEXT
+                );
+                CREATE INDEX IF NOT EXISTS products_default_code ON products(default_code);
+                CREATE INDEX IF NOT EXISTS products_barcode ON products(barcode);
+                CREATE INDEX IF NOT EXISTS products_norm_name ON products(norm_name);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                """
+            )
+
+    def _connect(self):
+        # One short-lived connection per operation keeps the catalog safe to
+        # share between Streamlit sessions / threads.
+        return sqlite3.connect(self.path, timeout=30)
+
+    def meta(self):
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT key, value FROM meta"))
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def sync(self, models, db, uid, password, ctx=None, page_size=SYNC_PAGE_SIZE):
+        start = time.perf_counter()
+        last_sync = self.meta().get("last_sync")
+        # ">=": write_date has one-second precision, and re-applying the rows of
+        # the last synced second is harmless (INSERT OR REPLACE).
+        domain = [["write_date", ">=", last_sync]] if last_sync else []
+        # Archived products are pulled too, so they can be dropped locally.
+        context = {**(ctx or {}), "active_test": False}
+
+        pulled = 0
+        newest = last_sync
+        offset = 0
+        while True:
+            products = models.execute_kw(
+                db, uid, password,
+                "product.product", "search_read",
+                [domain],
+                {
+                    "fields": PRODUCT_FIELDS + ["active", "write_date"],
+                    "order": "write_date asc, id asc",
+                    "offset": offset,
+                    "limit": page_size,
+                    "context": context,
+                },
+            )
+            if not products:
+                break
+            self._apply(products)
+            pulled += len(products)
+            newest = max(newest or "", products[-1]["write_date"])
+            if len(products) < page_size:
+                break
+            offset += page_size
+
+        duration = time.perf_counter() - start
+        stats = {
+            "last_sync": newest or "",
+            "last_pulled": str(pulled),
+            "last_duration": f"{duration:.3f}",
+            "last_run": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", stats.items()
+            )
+        return {"pulled": pulled, "seconds": duration}
+
+    def _apply(self, products):
+        active, archived = [], []
+        for p in products:
+            if not p.get("active", True):
+                archived.append((p["id"],))
+                continue
+            active.append(
+                (
+                    p["id"],
+                    p.get("default_code") or None,
+                    p.get("barcode") or None,
+                    p.get("name") or "",
+                    normalize_name(p.get("name") or ""),
+                    p.get("write_date"),
+                )
+            )
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?, ?)", active
+            )
+            conn.executemany("DELETE FROM products WHERE id = ?", archived)
+
+    def iter_products(self):
+        with self._connect() as conn:
+            for r in conn.execute("SELECT id, default_code, barcode, name FROM products"):
+                yield {"id": r[0], "default_code": r[1], "barcode": r[2], "name": r[3]}
+
+    def match(self, names):
+        # Returns a ProductIndex answering lookup(name) for every given name
+        # found locally, so it can replace resolve_products() transparently.
+        index = ProductIndex()
+        names = [n for n in dict.fromkeys(names) if n]
+        if not names:
+            return index
+
+        with self._connect() as conn:
+            for column in ("default_code", "barcode"):
+                for start in range(0, len(names), LOOKUP_CHUNK_SIZE):
+                    chunk = names[start:start + LOOKUP_CHUNK_SIZE]
+                    rows = conn.execute(
+                        f"SELECT id, default_code, barcode, name FROM products "
+                        f"WHERE {column} IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                    index.add(
+                        {"id": r[0], "default_code": r[1], "barcode": r[2], "name": r[3]}
+                        for r in rows
+                    )
+
+            pending = [n for n in names if index.lookup(n) is None]
+            by_norm = {}
+            for n in pending:
+                by_norm.setdefault(normalize_name(n), []).append(n)
+            norms = list(by_norm)
+            for start in range(0, len(norms), LOOKUP_CHUNK_SIZE):
+                chunk = norms[start:start + LOOKUP_CHUNK_SIZE]
+                rows = conn.execute(
+                    f"SELECT id, default_code, barcode, name, norm_name FROM products "
+                    f"WHERE norm_name IN ({','.join('?' * len(chunk))}) ORDER BY id",
+                    chunk,
+                )
+                for r in rows:
+                    product = {"id": r[0], "default_code": r[1], "barcode": r[2], "name": r[3]}
+                    for original in by_norm[r[4]]:
+                        index.by_field["name"].setdefault(original, product)
+        return index
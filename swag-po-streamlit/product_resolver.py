@@ -0,0 +1,80 @@
+# ========= PRODUCT RESOLVER =========
+# Maps invoice model codes (order_line/name) to product.product IDs in bulk:
+# distinct names are looked up with chunked "in" domains, first on
+# default_code, then barcode, then name, so thousands of lines resolve in a
+# handful of search_read calls.
+
+RESOLVE_FIELDS = ["default_code", "barcode", "name"]
+PRODUCT_FIELDS = ["default_code", "barcode", "name"]
+RESOLVE_CHUNK_SIZE = 500
+
+
+class ProductIndex:
+    def __init__(self):
+        self.by_field = {field: {} for field in RESOLVE_FIELDS}
+
+    def add(self, products):
+        for product in products:
+            for field in RESOLVE_FIELDS:
+                value = product.get(field)
+                if value:
+                    self.by_field[field].setdefault(value, product)
+
+    def lookup(self, key):
+        for field in RESOLVE_FIELDS:
+            product = self.by_field[field].get(key)
+            if product is not None:
+                return product
+        return None
+
+    def __len__(self):
+        return len({p["id"] for index in self.by_field.values() for p in index.values()})
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def resolve_products(models, db, uid, password, names, ctx=None, index=None,
+                     chunk_size=RESOLVE_CHUNK_SIZE):
+    index = index if index is not None else ProductIndex()
+    pending = [n for n in dict.fromkeys(names) if n and index.lookup(n) is None]
+
+    for field in RESOLVE_FIELDS:
+        if not pending:
+            break
+        for chunk in _chunks(pending, chunk_size):
+            products = models.execute_kw(
+                db, uid, password,
+                "product.product", "search_read",
+                [[[field, "in", chunk]]],
+                {"fields": PRODUCT_FIELDS, "context": ctx or {}},
+            )
+            index.add(products)
+        pending = [n for n in pending if index.lookup(n) is None]
+
+    return index
+
+
+def split_matched(lines, log, index):
+    # Attach product_id to resolvable lines; everything else becomes a
+    # missing-product row for the log tab and is left out of the PO.
+    matched, missing, product_ids = [], [], []
+    for i, line in enumerate(lines):
+        product = index.lookup(line["name"])
+        if product is None:
+            product_ids.append(None)
+            missing.append(
+                {
+                    "row": int(log.row_positions[i]) + 2,
+                    "model": line["name"],
+                    "qty": line["product_qty"],
+                    "price": line["price_unit"],
+                }
+            )
+            continue
+        product_ids.append(product["id"])
+        matched.append({**line, "product_id": product["id"]})
+    log.product_ids = product_ids
+    return matched, missing
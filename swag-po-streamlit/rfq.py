@@ -0,0 +1,323 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from tracing import bind_context
+
+# ========= RFQ HELPERS =========
+RFQ_FIELDS = ["name", "partner_id", "date_order", "amount_total", "state", "company_id"]
+RFQ_STATES = ["draft", "sent", "to approve"]
+# button_confirm silently ignores anything else ("to approve" needs a manager's
+# button_approve), so only these states are sent to it.
+CONFIRMABLE_STATES = ("draft", "sent")
+RFQ_ORDER = "date_order desc, id desc"
+RFQ_PAGE_SIZE = 50
+
+
+def rfq_domain(company_id=None, vendor_id=None, date_from=None, date_to=None,
+               states=("draft", "sent")):
+    domain = [["state", "in", list(states)]]
+    if company_id:
+        domain.append(["company_id", "=", company_id])
+    if vendor_id:
+        domain.append(["partner_id", "=", vendor_id])
+    if date_from:
+        domain.append(["date_order", ">=", f"{date_from} 00:00:00"])
+    if date_to:
+        domain.append(["date_order", "<=", f"{date_to} 23:59:59"])
+    return domain
+
+
+def load_rfq(models, db, uid, password, company_id=None, limit=100, offset=0, domain=None):
+    if domain is None:
+        domain = rfq_domain(company_id)
+    rfqs = models.execute_kw(
+        db, uid, password,
+        "purchase.order", "search_read",
+        [domain],
+        {"fields": RFQ_FIELDS, "limit": limit, "offset": offset, "order": RFQ_ORDER},
+    )
+    return rfqs
+
+
+def count_rfq(models, db, uid, password, domain):
+    return models.execute_kw(
+        db, uid, password,
+        "purchase.order", "search_count",
+        [domain],
+    )
+
+
+def confirm_rfq(models, db, uid, password, rfq_ids, ctx=None):
+    if not rfq_ids:
+        return
+    ctx = ctx or {}
+    models.execute_kw(
+        db, uid, password,
+        "purchase.order", "button_confirm",
+        [rfq_ids],
+        {"context": ctx},
+    )
+
+
+# ========= BATCHED RFQ CONFIRMATION =========
+# Selected RFQs are confirmed in batches across a small worker pool. Odoo
+# rolls back a failed button_confirm call as a whole, so a failing batch is
+# bisected until the offending RFQs are isolated and everything else is
+# still confirmed. Re-sending an already confirmed order is a no-op in Odoo.
+# States are read first: RFQs that button_confirm would skip are reported as
+# "skipped" instead of being counted as confirmed.
+
+CONFIRM_BATCH_SIZE = 20
+CONFIRM_WORKERS = 4
+
+
+def _confirm_batch(models, db, uid, password, ids, ctx):
+    start = time.perf_counter()
+    try:
+        confirm_rfq(models, db, uid, password, ids, ctx)
+    except Exception as e:
+        if len(ids) == 1:
+            return [{"id": ids[0], "status": "error", "error": str(e),
+                     "seconds": round(time.perf_counter() - start, 3)}]
+        mid = len(ids) // 2
+        return (
+            _confirm_batch(models, db, uid, password, ids[:mid], ctx)
+            + _confirm_batch(models, db, uid, password, ids[mid:], ctx)
+        )
+    seconds = round(time.perf_counter() - start, 3)
+    return [{"id": i, "status": "confirmed", "error": "", "seconds": seconds} for i in ids]
+
+
+def confirm_rfqs_batched(models, db, uid, password, rfq_ids, ctx=None,
+                         batch_size=CONFIRM_BATCH_SIZE, max_workers=CONFIRM_WORKERS,
+                         on_progress=None):
+    # on_progress(done, total, batch_results) runs on the calling thread, so
+    # it may safely update Streamlit elements.
+    start = time.perf_counter()
+    ids = list(rfq_ids)
+    states = {
+        r["id"]: r["state"]
+        for r in models.execute_kw(
+            db, uid, password,
+            "purchase.order", "search_read",
+            [[["id", "in", ids]]],
+            {"fields": ["state"], "context": ctx or {}},
+        )
+    }
+    results = [
+        {"id": i, "status": "skipped",
+         "error": f"state '{states[i]}' cannot be confirmed" if i in states else "not found",
+         "seconds": 0.0}
+        for i in ids if states.get(i) not in CONFIRMABLE_STATES
+    ]
+    if results and on_progress is not None:
+        on_progress(len(results), len(ids), list(results))
+    confirmable = [i for i in ids if states.get(i) in CONFIRMABLE_STATES]
+    batches = [confirmable[i:i + batch_size] for i in range(0, len(confirmable), batch_size)]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(bind_context(_confirm_batch), models, db, uid, password, batch, ctx)
+            for batch in batches
+        ]
+        for future in as_completed(futures):
+            batch_results = future.result()
+            results.extend(batch_results)
+            if on_progress is not None:
+                on_progress(len(results), len(ids), batch_results)
+    order = {rfq_id: n for n, rfq_id in enumerate(ids)}
+    results.sort(key=lambda r: order[r["id"]])
+    return results, time.perf_counter() - start
+
+
+# ========= PAGINATED RFQ STORE =========
+# Pages are fetched with offset/limit and cached per (domain, page) for a
+# short TTL, so a row click in the RFQ table reruns the script without
+# hitting Odoo. The next page is prefetched in the background.
+
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rfq-prefetch")
+
+
+class RfqPageStore:
+    def __init__(self, models, db, uid, password, page_size=RFQ_PAGE_SIZE, ttl=60, max_pages=64):
+        self.conn = (models, db, uid, password)
+        self.page_size = page_size
+        self.ttl = ttl
+        self.max_pages = max_pages
+        self._pages = OrderedDict()  # (domain_key, page) -> (fetched_at, rows)
+        self._counts = {}            # domain_key -> (fetched_at, count)
+        self._pending = {}           # (domain_key, page) -> Future
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(domain):
+        return json.dumps(domain, sort_keys=True, default=str)
+
+    def _fresh(self, entry):
+        return entry is not None and time.monotonic() - entry[0] < self.ttl
+
+    def count(self, domain):
+        key = self._key(domain)
+        with self._lock:
+            entry = self._counts.get(key)
+        if self._fresh(entry):
+            return entry[1]
+        total = count_rfq(*self.conn, domain)
+        with self._lock:
+            self._counts[key] = (time.monotonic(), total)
+        return total
+
+    def page_count(self, domain):
+        return max(1, -(-self.count(domain) // self.page_size))
+
+    def _fetch(self, key, domain, page):
+        try:
+            rows = load_rfq(
+                *self.conn, limit=self.page_size, offset=page * self.page_size, domain=domain
+            )
+        finally:
+            with self._lock:
+                self._pending.pop((key, page), None)
+        with self._lock:
+            self._pages[(key, page)] = (time.monotonic(), rows)
+            self._pages.move_to_end((key, page))
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return rows
+
+    def page(self, domain, page):
+        key = self._key(domain)
+        with self._lock:
+            entry = self._pages.get((key, page))
+            pending = self._pending.get((key, page))
+            if self._fresh(entry):
+                self._pages.move_to_end((key, page))
+                return entry[1]
+        if pending is not None:
+            return pending.result()
+        return self._fetch(key, domain, page)
+
+    def prefetch(self, domain, page):
+        if page < 0 or page >= self.page_count(domain):
+            return
+        key = self._key(domain)
+        with self._lock:
+            if self._fresh(self._pages.get((key, page))) or (key, page) in self._pending:
+                return
+            self._pending[(key, page)] = _prefetch_pool.submit(
+                bind_context(self._fetch), key, domain, page
+            )
+
+    def invalidate(self):
+        with self._lock:
+            self._pages.clear()
+            self._counts.clear()
+
+
+# ========= INCREMENTAL RFQ SNAPSHOT =========
+# Local copy of a company's open RFQs. refresh() only downloads records whose
+# write_date is newer than the last sync, and one cheap search() of current
+# IDs drops RFQs that were confirmed, cancelled or deleted meanwhile. The
+# display columns (vendor / company names) are derived for changed rows only.
+
+# The empty starting frame is typed: concat with an untyped empty frame turns
+# every column into object for good (pandas 3).
+SNAPSHOT_DTYPES = {
+    "id": "int64",
+    "name": "str",
+    "partner_id": "object",
+    "date_order": "str",
+    "amount_total": "float64",
+    "state": "str",
+    "company_id": "object",
+    "write_date": "str",
+    "vendor": "str",
+    "company": "str",
+}
+
+
+def m2o_name(value):
+    return value[1] if isinstance(value, (list, tuple)) and len(value) > 1 else ""
+
+
+def with_display_columns(df):
+    df["vendor"] = [m2o_name(v) for v in df["partner_id"]]
+    df["company"] = [m2o_name(v) for v in df["company_id"]]
+    return df
+
+
+class RfqSnapshot:
+    def __init__(self, company_id, states=RFQ_STATES):
+        self.company_id = company_id
+        self.states = list(states)
+        self.df = pd.DataFrame(
+            {col: pd.Series(dtype=dtype) for col, dtype in SNAPSHOT_DTYPES.items()}
+        )
+        self.last_sync = None
+        self.refreshed_at = None
+        self.stats = {}
+
+    def refresh(self, models, db, uid, password):
+        start = time.perf_counter()
+        domain = rfq_domain(self.company_id, states=self.states)
+        current_ids = models.execute_kw(
+            db, uid, password,
+            "purchase.order", "search",
+            [domain],
+        )
+        # write_date has one-second precision: ">=" re-reads the rows of the last
+        # synced second, so a write later in that same second is not missed.
+        delta_domain = domain + [["write_date", ">=", self.last_sync]] if self.last_sync else domain
+        changed = models.execute_kw(
+            db, uid, password,
+            "purchase.order", "search_read",
+            [delta_domain],
+            {"fields": RFQ_FIELDS + ["write_date"], "order": RFQ_ORDER},
+        )
+
+        before = len(self.df)
+        changed_ids = {r["id"] for r in changed}
+        keep = self.df["id"].isin(current_ids) & ~self.df["id"].isin(changed_ids)
+        removed = int((~self.df["id"].isin(current_ids)).sum())
+        parts = [self.df[keep]]
+        if changed:
+            parts.append(with_display_columns(pd.DataFrame(changed)))
+        self.df = (
+            pd.concat(parts, ignore_index=True)
+            .sort_values(["date_order", "id"], ascending=False, ignore_index=True)
+        )
+        if changed:
+            newest = max(r["write_date"] for r in changed)
+            self.last_sync = max(self.last_sync or "", newest)
+
+        self.refreshed_at = time.monotonic()
+        self.stats = {
+            "fetched": len(changed),
+            "removed": removed,
+            "total": len(self.df),
+            "previous": before,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        return self.stats
+
+    def age(self):
+        return None if self.refreshed_at is None else time.monotonic() - self.refreshed_at
+
+    def filtered(self, vendor_id=None, date_from=None, date_to=None, states=None):
+        df = self.df
+        mask = pd.Series(True, index=df.index)
+        if states:
+            mask &= df["state"].isin(states)
+        if vendor_id:
+            mask &= df["partner_id"].map(
+                lambda v: isinstance(v, (list, tuple)) and bool(v) and v[0] == vendor_id
+            )
+        if date_from:
+            mask &= df["date_order"] >= f"{date_from} 00:00:00"
+        if date_to:
+            mask &= df["date_order"] <= f"{date_to} 23:59:59"
+        return df[mask]
@@ -0,0 +1,198 @@
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from pdf_parser import NAME_COL
+
+# ========= COMPACT SESSION STATE =========
+# Every Streamlit session keeps its parsed upload, selection, PO lines and log
+# in memory. These containers keep that state columnar: names become
+# categoricals, numbers live in numpy arrays, a selection is either "all of
+# n" or an int32 index array, and the log is a bounded ring buffer.
+# Qty and price stay float64 so the values sent to Odoo are never rounded.
+
+LOG_CAPACITY = 200
+
+
+def compact_lines_df(df: pd.DataFrame) -> pd.DataFrame:
+    if NAME_COL in df.columns and len(df):
+        df[NAME_COL] = df[NAME_COL].astype("category")
+    for col in df.columns:
+        if col != NAME_COL and df[col].dtype == object:
+            converted = pd.to_numeric(df[col], errors="coerce")
+            if converted.notna().sum() == df[col].notna().sum():
+                df[col] = converted
+    return df
+
+
+class RowSelection:
+    # Selected row positions of the uploaded file. "Select all" is stored as
+    # just the row count; manual selections as a sorted int32 array.
+
+    def __init__(self, total, rows=None):
+        self.total = total
+        self.rows = None if rows is None else np.unique(np.asarray(rows, dtype=np.int32))
+
+    @classmethod
+    def all(cls, total):
+        return cls(total)
+
+    @property
+    def is_all(self):
+        return self.rows is None
+
+    def __len__(self):
+        return self.total if self.rows is None else len(self.rows)
+
+    def __iter__(self):
+        return iter(range(self.total) if self.rows is None else self.rows.tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        arr = np.arange(self.total, dtype=np.int32) if self.rows is None else self.rows
+        return arr if dtype is None else arr.astype(dtype)
+
+    def contains(self, positions):
+        # Boolean mask: which of these row positions are selected.
+        positions = np.asarray(positions)
+        if self.rows is None:
+            return np.ones(len(positions), dtype=bool)
+        return np.isin(positions, self.rows)
+
+    def replace_window(self, window, selected):
+        # The ticked rows of a preview window replace only that window's rows.
+        current = np.asarray(self, dtype=np.int32)
+        kept = current[~np.isin(current, window)]
+        return RowSelection(self.total, np.concatenate([kept, np.asarray(selected, dtype=np.int32)]))
+
+    def nbytes(self):
+        return 0 if self.rows is None else self.rows.nbytes
+
+
+class LineStore:
+    # PO lines as columns; behaves like the list of order_line dicts it
+    # replaces (len, iteration, indexing and slicing return dicts).
+
+    def __init__(self, names, qty, price, product_ids, distribution_ids, vendor_ids, picking_ids):
+        self.names = names
+        self.qty = qty
+        self.price = price
+        self.product_ids = product_ids
+        self.distribution_ids = distribution_ids
+        self.vendor_ids = vendor_ids
+        self.picking_ids = picking_ids
+
+    @classmethod
+    def from_lines(cls, lines, keys):
+        def ids(values):
+            return np.asarray([-1 if v is None else int(v) for v in values], dtype=np.int64)
+
+        return cls(
+            pd.Categorical([line["name"] for line in lines]),
+            np.asarray([line["product_qty"] for line in lines], dtype=np.float64),
+            np.asarray([line["price_unit"] for line in lines], dtype=np.float64),
+            ids(line.get("product_id") for line in lines),
+            ids(line.get("analytic_distribution_id") for line in lines),
+            ids(k[0] for k in keys),
+            ids(k[1] for k in keys),
+        )
+
+    def _line(self, i):
+        line = {
+            "name": self.names[i],
+            "product_qty": float(self.qty[i]),
+            "price_unit": float(self.price[i]),
+        }
+        if self.product_ids[i] >= 0:
+            line["product_id"] = int(self.product_ids[i])
+        if self.distribution_ids[i] >= 0:
+            line["analytic_distribution_id"] = int(self.distribution_ids[i])
+        return line
+
+    def __len__(self):
+        return len(self.qty)
+
+    def __iter__(self):
+        return (self._line(i) for i in range(len(self)))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._line(i) for i in range(*key.indices(len(self)))]
+        return self._line(range(len(self))[key])
+
+    def keys(self):
+        return [
+            (None if v < 0 else int(v), None if p < 0 else int(p))
+            for v, p in zip(self.vendor_ids, self.picking_ids)
+        ]
+
+    def nbytes(self):
+        return (
+            self.names.nbytes + self.qty.nbytes + self.price.nbytes + self.product_ids.nbytes
+            + self.distribution_ids.nbytes + self.vendor_ids.nbytes + self.picking_ids.nbytes
+        )
+
+
+# ========= SESSION MEMORY REPORT =========
+# Process-wide registry of per-session state sizes for the admin view.
+
+_session_sizes = {}
+_session_lock = threading.Lock()
+SESSION_STALE_AFTER = 3600
+
+
+def estimate_bytes(value, _depth=0):
+    if value is None:
+        return 0
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, "nbytes") and callable(value.nbytes):
+        return value.nbytes()
+    size = sys.getsizeof(value)
+    if _depth > 3:
+        return size
+    if isinstance(value, dict):
+        size += sum(
+            estimate_bytes(k, _depth + 1) + estimate_bytes(v, _depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(estimate_bytes(v, _depth + 1) for v in value)
+    return size
+
+
+def record_session_memory(session_id, state):
+    sizes = {}
+    for key in list(state.keys()):
+        try:
+            sizes[key] = estimate_bytes(state[key])
+        except Exception:
+            continue
+    now = time.time()
+    with _session_lock:
+        _session_sizes[session_id] = (now, sizes)
+        for sid in [s for s, (seen, _) in _session_sizes.items() if now - seen > SESSION_STALE_AFTER]:
+            del _session_sizes[sid]
+
+
+def session_memory_report():
+    with _session_lock:
+        items = list(_session_sizes.items())
+    rows = []
+    for session_id, (seen, sizes) in items:
+        top = sorted(sizes.items(), key=lambda kv: -kv[1])[:3]
+        rows.append(
+            {
+                "session": session_id[:8],
+                "last_seen": time.strftime("%H:%M:%S", time.localtime(seen)),
+                "total_kb": round(sum(sizes.values()) / 1024, 1),
+                "largest": ", ".join(f"{k} {v / 1024:.0f} KB" for k, v in top),
+            }
+        )
+    return sorted(rows, key=lambda r: -r["total_kb"])
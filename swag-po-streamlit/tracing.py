@@ -0,0 +1,169 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# ========= TRACING =========
+# Opt-in timing of the hot paths: every Odoo execute_kw call (model, method,
+# request / response bytes, latency) and the parse / line-build stages. Spans
+# go to the RerunTrace bound to the current context; work handed to a pool
+# is wrapped with bind_context so it lands in the same rerun. A background
+# job can outlive its rerun: spans added after the rerun finished still go
+# into the session totals. With no trace bound, span() and active_trace() are
+# a single ContextVar lookup.
+
+TRACE_DEFAULT = os.environ.get("SWAG_TRACE", "0") == "1"
+TRACE_FILE = os.environ.get("SWAG_TRACE_FILE", "")
+SESSION_RERUNS_KEPT = 50
+
+_current = contextvars.ContextVar("swag_trace", default=None)
+
+
+class RerunTrace:
+    def __init__(self, session_id=None):
+        self.session_id = session_id
+        self.started_at = time.time()
+        self.spans = []
+        self.finished = False
+        self.session = None  # SessionTrace that folds in late spans
+        self._lock = threading.Lock()
+
+    def add(self, kind, name, seconds, **attrs):
+        span = {
+            "kind": kind,
+            "name": name,
+            "ms": round(seconds * 1000, 3),
+            "at": round(time.time() - self.started_at, 4),
+            **attrs,
+        }
+        with self._lock:
+            self.spans.append(span)
+            late = self.finished
+        if late and self.session is not None:
+            self.session.fold(self, [span])
+
+    def total_ms(self):
+        return round((time.time() - self.started_at) * 1000, 1)
+
+
+class SessionTrace:
+    # Kept in session state: the last few reruns plus running per-span totals.
+
+    def __init__(self, session_id=None):
+        self.session_id = session_id
+        self.reruns = []
+        self.totals = {}  # (kind, name) -> [count, total_ms, max_ms]
+        self._lock = threading.Lock()
+
+    def begin_rerun(self):
+        # A rerun cut short by st.stop() or an exception is folded in here.
+        if self.reruns and not self.reruns[-1].finished:
+            self.finish_rerun(self.reruns[-1])
+        trace = RerunTrace(self.session_id)
+        trace.session = self
+        self.reruns.append(trace)
+        del self.reruns[:-SESSION_RERUNS_KEPT]
+        return trace
+
+    def finish_rerun(self, trace):
+        with trace._lock:
+            if trace.finished:
+                return
+            trace.finished = True
+            spans = list(trace.spans)
+        self.fold(trace, spans)
+
+    def fold(self, trace, spans):
+        with self._lock:
+            for span in spans:
+                entry = self.totals.setdefault((span["kind"], span["name"]), [0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += span["ms"]
+                entry[2] = max(entry[2], span["ms"])
+            if TRACE_FILE:
+                with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                    f.write(to_jsonl([trace], spans))
+
+    def summary(self):
+        with self._lock:
+            totals = list(self.totals.items())
+        return sorted(
+            (
+                {"kind": kind, "name": name, "calls": count,
+                 "total_ms": round(total, 1), "avg_ms": round(total / count, 1),
+                 "max_ms": round(peak, 1)}
+                for (kind, name), (count, total, peak) in totals
+            ),
+            key=lambda r: -r["total_ms"],
+        )
+
+    def to_jsonl(self):
+        return to_jsonl(self.reruns)
+
+
+def to_jsonl(reruns, spans=None):
+    # spans limits the output to those spans of a single rerun.
+    return "".join(
+        json.dumps({"session": t.session_id, "rerun_started": t.started_at, **span},
+                   default=str) + "\n"
+        for t in reruns
+        for span in (t.spans if spans is None else spans)
+    )
+
+
+def activate(trace):
+    return _current.set(trace)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def active_trace():
+    return _current.get()
+
+
+@contextmanager
+def _timed(trace, kind, name, attrs):
+    start = time.perf_counter()
+    try:
+        yield attrs
+    finally:
+        trace.add(kind, name, time.perf_counter() - start, **attrs)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(kind, name, **attrs):
+    # The yielded dict can be filled inside the block (e.g. row counts).
+    trace = _current.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _timed(trace, kind, name, attrs)
+
+
+def bind_context(fn):
+    # Wrap a callable for a worker thread so it records into the caller's trace.
+    trace = _current.get()
+    if trace is None:
+        return fn
+
+    def bound(*args, **kwargs):
+        token = _current.set(trace)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return bound